@@ -0,0 +1,335 @@
+import math
+import time
+from collections import deque
+from renderers import Renderer, chord_path, bezier_steps, color_to_rgb
+from shapes import Web
+
+"""
+the animation.py file contains the Animation class, which redraws shapes
+whose vertices, segments, or color change over time at a steady frame
+rate, and the ItemRenderer it draws them with, which moves the canvas
+items of the previous frame instead of creating new ones. The functions
+at the bottom make the time-varying values an animation is built from.
+
+"""
+
+
+class ItemRenderer(Renderer):
+    """
+    Draws shapes to a tkinter canvas frame after frame, reusing the items
+    of the frame before: the nth line a shape draws in a frame moves the
+    nth item it drew last time with coords(), and only items whose style
+    changed are reconfigured. Items are created only when a shape draws
+    more lines than before, and deleted when it draws fewer.
+    """
+    joins_chords = True
+
+    def __init__(self, canvas, view=None):
+        """
+        view: what the drawing is seen through, such as a Viewport (anything
+        with to_canvas(coords) and scale); None draws in canvas coordinates
+        """
+        self.canvas = canvas
+        self.view = view
+        self.items = {}  # tag -> list of [item id, style] in drawing order
+        self.current = None  # the item list of the shape being drawn
+        self.used = 0  # number of its items drawn so far this frame
+        self.created = 0  # number of items ever created, for reporting
+
+    @property
+    def scale(self):
+        return 1.0 if self.view is None else self.view.scale
+
+    def begin(self, tag):
+        """
+        Starts a frame of the shape with the tag given.
+        """
+        self.current = self.items.setdefault(tag, [])
+        self.used = 0
+
+    def end(self):
+        """
+        Ends the frame of the shape, deleting the items it did not draw this time.
+        """
+        for item_id, style in self.current[self.used:]:
+            self.canvas.delete(item_id)
+        del self.current[self.used:]
+        self.current = None
+
+    def place(self, coords, style):
+        """
+        Moves the next item of the shape to coords, or creates it.
+        style is (color, tag, splinesteps), splinesteps being None for
+        straight lines. returns the id of the item.
+        """
+        if self.view is not None:
+            coords = self.view.to_canvas(coords)
+        coords = list(coords)
+        if self.used < len(self.current):
+            item = self.current[self.used]
+            self.canvas.coords(item[0], coords)
+            if item[1] != style:
+                color, tag, steps = style
+                self.canvas.itemconfigure(item[0], fill=color, tags=tag, smooth=steps is not None,
+                                          splinesteps=steps or 12)
+                item[1] = style
+        else:
+            color, tag, steps = style
+            if steps is None:
+                item_id = self.canvas.create_line(coords, fill=color, tags=tag)
+            else:
+                item_id = self.canvas.create_line(coords, smooth=True, splinesteps=steps, fill=color, tags=tag)
+            item = [item_id, style]
+            self.current.append(item)
+            self.created += 1
+        self.used += 1
+        return item[0]
+
+    def draw_line(self, coords, color, tag):
+        return self.place(coords, (color, tag, None))
+
+    def draw_chords(self, line1, line2, color, tag):
+        if len(line1) == 0:
+            return None
+        return self.place(chord_path(line1, line2), (color, tag, None))
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        # a smoothed three point line, as TkRenderer draws it
+        steps = bezier_steps(point0, point1, point2, tolerance / self.scale)
+        return self.place([point0[0], point0[1], point1[0], point1[1], point2[0], point2[1]],
+                          (color, tag, steps))
+
+    def delete(self, tag):
+        self.items.pop(tag, None)
+        self.canvas.delete(tag)
+
+    def recolor(self, tag, color):
+        for item in self.items.get(tag, ()):
+            item[1] = (color,) + item[1][1:]
+        self.canvas.itemconfigure(tag, fill=color)
+
+    def lower(self, tag, below_tag):
+        self.canvas.tag_lower(tag, below_tag)
+
+
+class Animation:
+    """
+    Redraws a set of shapes at a steady frame rate from the Tk event loop.
+    Each shape has an update(shape, t) function that sets its vertices,
+    segments, or color for the time t in seconds since the start; the
+    shape is then drawn again through an ItemRenderer, so its canvas items
+    are moved rather than recreated, from geometry computed without the
+    geometry caches.
+
+    Each frame has a time budget below the frame interval. Shapes not
+    updated when the budget runs out keep their last frame and go first in
+    the next one. Frames that could not start on time are dropped rather
+    than drawn late: the animation follows the clock, not the frame count,
+    so it keeps its speed when the machine cannot keep up.
+
+    A web whose axes stop crossing keeps its last frame until they cross again.
+    """
+
+    def __init__(self, widget, renderer, fps=60, budget_ms=12, on_frame=None):
+        """
+        widget: any tkinter widget, used to schedule the frames
+        renderer: the ItemRenderer the shapes are drawn with
+        budget_ms: time the updates of a frame may take, kept below one frame
+        on_frame(animation): called after every frame, for example to show the fps
+        """
+        self.widget = widget
+        self.renderer = renderer
+        self.interval = 1 / fps
+        self.budget = budget_ms / 1000
+        self.on_frame = on_frame
+        self.tracks = []  # (shape, update) pairs
+        self.next_track = 0  # index of the shape the next frame updates first
+        self.after_id = None
+        self.started = None
+        self.due = None  # when the next frame should start
+        self.frames = 0  # frames drawn
+        self.dropped = 0  # frames skipped to catch up with the clock
+        self.deferred = 0  # shape updates put off to the next frame by the budget
+        self.frame_times = deque(maxlen=2 * fps)  # start times of the last frames, for fps
+
+    def add(self, shape, update):
+        """
+        Animates the shape with update(shape, t). returns the shape.
+        """
+        self.tracks.append((shape, update))
+        return shape
+
+    def remove(self, shape):
+        """
+        Stops animating the shape and deletes its items.
+        """
+        self.tracks = [(other, update) for other, update in self.tracks if other is not shape]
+        self.next_track = 0
+        self.renderer.delete(shape.tag)
+        shape.item_ids.clear()
+
+    def start(self):
+        self.started = self.due = time.perf_counter()
+        self.after_id = self.widget.after_idle(self.tick)
+        return self
+
+    def tick(self):
+        """
+        Draws one frame and schedules the next at the following frame
+        boundary, dropping the frames the clock has already passed.
+        """
+        self.after_id = None
+        now = time.perf_counter()
+        late = now - self.due
+        if late >= self.interval:
+            missed = int(late / self.interval)
+            self.dropped += missed
+            self.due += missed * self.interval
+        self.draw_frame(now - self.started, now + self.budget)
+        self.frames += 1
+        self.frame_times.append(now)
+        if self.on_frame is not None:
+            self.on_frame(self)
+        self.due += self.interval
+        delay = self.due - time.perf_counter()
+        self.after_id = self.widget.after(max(1, int(delay * 1000)), self.tick)
+
+    def draw_frame(self, t, deadline):
+        """
+        Updates and redraws the shapes for time t until the deadline, at
+        least one shape per frame. returns the number of shapes drawn.
+        """
+        count = len(self.tracks)
+        for drawn in range(count):
+            if drawn and time.perf_counter() >= deadline:
+                self.deferred += count - drawn
+                return drawn
+            shape, update = self.tracks[self.next_track]
+            self.next_track = (self.next_track + 1) % count
+            update(shape, t)
+            self.draw(shape)
+        return count
+
+    def draw(self, shape):
+        if isinstance(shape, Web) and shape.get_point_of_int() is None:
+            # the axes have stopped crossing, so the web keeps its last frame
+            return
+        # the geometry of a frame is never needed again, so it stays out of
+        # the caches that keep the geometry of the shapes that stand still
+        self.renderer.begin(shape.tag)
+        shape.item_ids.clear()
+        shape.draw_outline(self.renderer)
+        if shape.envelope:
+            shape.draw_envelopes(self.renderer)
+        else:
+            shape.draw_families(self.renderer, shape.chord_families(self.renderer.scale, cached=False))
+        self.renderer.end()
+
+    def stop(self):
+        """
+        Stops the animation; the shapes stay on the canvas as last drawn.
+        """
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    def clear(self):
+        """
+        Stops the animation and deletes the items of every shape.
+        """
+        self.stop()
+        for shape, update in self.tracks:
+            self.renderer.delete(shape.tag)
+            shape.item_ids.clear()
+        self.tracks.clear()
+
+    def is_running(self):
+        return self.after_id is not None
+
+    def fps(self):
+        """
+        returns the frame rate achieved over the last second or so.
+        """
+        if len(self.frame_times) < 2:
+            return 0.0
+        span = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / span if span > 0 else 0.0
+
+    def report(self):
+        return "%.1f fps, %d frames dropped" % (self.fps(), self.dropped)
+
+
+# time-varying values for update functions
+
+def ping_pong(low, high, period):
+    """
+    returns a function of t that runs from low to high and back in period seconds.
+    """
+    def value(t):
+        phase = (t / period) % 1.0
+        return low + (high - low) * (1 - abs(2 * phase - 1))
+    return value
+
+
+def orbit(center, radius, period, phase=0.0):
+    """
+    returns a function of t that moves a point around a circle once every period seconds.
+    """
+    def point(t):
+        angle = 2 * math.pi * (t / period + phase)
+        return center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle)
+    return point
+
+
+def along_path(points, period):
+    """
+    returns a function of t that moves a point along the closed path through
+    points at an even speed, once round every period seconds.
+    """
+    sides = list(zip(points, points[1:] + points[:1]))
+    lengths = [math.hypot(end[0] - start[0], end[1] - start[1]) for start, end in sides]
+    total = sum(lengths)
+
+    def point(t):
+        distance = (t / period) % 1.0 * total
+        for (start, end), length in zip(sides, lengths):
+            if distance <= length and length > 0:
+                f = distance / length
+                return start[0] + (end[0] - start[0]) * f, start[1] + (end[1] - start[1]) * f
+            distance -= length
+        return points[0]
+    return point
+
+
+def color_cycle(colors, period):
+    """
+    returns a function of t that fades through the colors given and back
+    to the first, once every period seconds, as '#rrggbb' strings.
+    """
+    rgbs = [color_to_rgb(color) for color in colors]
+
+    def color(t):
+        position = (t / period) % 1.0 * len(rgbs)
+        i = int(position)
+        f = position - i
+        start = rgbs[i]
+        end = rgbs[(i + 1) % len(rgbs)]
+        return '#%02x%02x%02x' % tuple(round(a + (b - a) * f) for a, b in zip(start, end))
+    return color
+
+
+def updater(vertices=None, segments=None, color=None):
+    """
+    returns an update(shape, t) function for Animation.add. vertices is a
+    list with one entry per vertex, either a fixed (x, y) point or a
+    function of t such as orbit(); segments and color are functions of t.
+    Anything left as None is not changed.
+    """
+    def update(shape, t):
+        if vertices is not None:
+            shape.set_vertices([vertex(t) if callable(vertex) else vertex for vertex in vertices], cached=False)
+        if segments is not None:
+            shape.segments = max(1, round(segments(t)))
+        if color is not None:
+            shape.color = color(t)
+    return update
@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from shapes import AXES_PROBLEMS, INTERSECT, Web, make_shape
+from renderers import WRITERS, color_to_rgb, open_writer
+from raster import export_png
+
+"""
+This batch_render.py file renders shapes without the GUI. It reads a job
+file, draws the shapes of every job with the Angle, Polygon, and Web
+classes, and writes each job to an SVG, PDF, PostScript, or PNG file. Jobs are
+spread over a pool of worker processes. Nothing on this path imports tkinter.
+
+A job file is a JSON list of jobs (or an object with a "jobs" list).
+Each job names its output file and lists its shapes:
+
+    {"output": "star.svg",
+     "shapes": [{"shape": "poly", "vertices": [[10, 10], [250, 40], [120, 300]],
+                 "segments": 40, "color": "#FF8800"}]}
+
+A job holding a single shape may give the shape keys directly
+instead of a "shapes" list. A web takes the four ends of its axes and,
+for a star, the tips of any more spokes. A shape with "envelope": true is drawn as
+its smooth envelope curves only, without the chords. A PNG job may give
+its image size in pixels with "pixels" (default: the drawing size), and
+"tiled": true to write one PNG per tile instead of a single image.
+A color is one tkinter takes, an X11 name such as "navy" or a "#rrggbb"
+value; a job file with any other color is refused before anything is drawn.
+
+usage: python batch_render.py jobs.json -o out_dir -j 4
+
+"""
+
+DEFAULT_SIZE = 500
+MIN_VERTICES = {'angle': 3, 'poly': 3, 'web': 4}
+MAX_VERTICES = {'angle': 3}
+
+
+def load_jobs(path):
+    """
+    Reads the job file and returns the list of jobs, each one a dict
+    with an 'output' file name and a list of 'shapes'.
+    Raises ValueError for a malformed job.
+    """
+    with open(path) as job_file:
+        data = json.load(job_file)
+    if isinstance(data, dict):
+        data = data.get('jobs', [])
+    jobs = []
+    for number, job in enumerate(data, 1):
+        shapes_ = job['shapes'] if 'shapes' in job else [job]
+        output = job.get('output', 'job%d.svg' % number)
+        if os.path.splitext(output)[1].lower() not in WRITERS and not output.lower().endswith('.png'):
+            raise ValueError('job %d: cannot write %r, use one of %s'
+                             % (number, output, ', '.join(sorted(WRITERS) + ['.png'])))
+        for spec in shapes_:
+            shape_ = spec.get('shape')
+            if shape_ not in MIN_VERTICES:
+                raise ValueError('job %d: unknown shape %r' % (number, shape_))
+            num_vertices = len(spec.get('vertices', []))
+            if num_vertices < MIN_VERTICES[shape_] or num_vertices > MAX_VERTICES.get(shape_, num_vertices):
+                raise ValueError('job %d: a %s cannot have %d vertices' % (number, shape_, num_vertices))
+            try:
+                color_to_rgb(spec.get('color', 'black'))
+            except (ValueError, AttributeError):
+                raise ValueError('job %d: unknown color %r' % (number, spec.get('color'))) from None
+        jobs.append({'number': number, 'output': output, 'shapes': shapes_,
+                     'pixels': job.get('pixels'), 'tiled': bool(job.get('tiled', False))})
+    return jobs
+
+
+def render_job(job, out_dir, size):
+    """
+    Draws all the shapes of one job into its output file.
+    Runs in a worker process; returns a dict describing the result.
+    """
+    start = time.perf_counter()
+    path = os.path.join(out_dir, job['output'])
+    error = None
+    bounds = (0, 0, size - 1, size - 1)
+    try:
+        # check the axes of every web of the job in one go before drawing anything
+        webs = [spec for spec in job['shapes'] if spec['shape'] == 'web']
+        for spec, (status, point) in zip(webs, Web.intersections([spec['vertices'] for spec in webs], bounds)):
+            if status != INTERSECT:
+                raise ValueError('web %s: %s' % (spec['vertices'][:4], AXES_PROBLEMS[status]))
+        shapes_ = []
+        for spec in job['shapes']:
+            shape = make_shape(spec['shape'], spec['vertices'],
+                               int(spec.get('segments', 30)), spec.get('color', 'black'), bounds)
+            shape.envelope = bool(spec.get('envelope', False))
+            shapes_.append(shape)
+        if path.lower().endswith('.png'):
+            export_png(shapes_, path, int(job.get('pixels') or size), drawing_size=size,
+                       tiled=job.get('tiled', False))
+        else:
+            with open_writer(path, size, size) as renderer:
+                for shape in shapes_:
+                    shape.fill(renderer)
+    except Exception as e:  # report the failed job and keep going with the others
+        error = str(e)
+        if os.path.exists(path):
+            os.remove(path)  # don't leave a half written file behind
+    return {'number': job['number'], 'output': path, 'shapes': len(job['shapes']),
+            'seconds': time.perf_counter() - start, 'error': error}
+
+
+def run_jobs(jobs, out_dir, size=DEFAULT_SIZE, workers=None):
+    """
+    Renders all the jobs, using a pool of worker processes when workers
+    is not 1 (None uses every core). Yields each result as it completes,
+    in job order.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield render_job(job, out_dir, size)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(render_job, jobs, [out_dir] * len(jobs), [size] * len(jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render parabolic curves without the GUI.")
+    parser.add_argument('job_file', help="JSON file listing the jobs to render")
+    parser.add_argument('-o', '--out-dir', default='.', help="directory to write the output files to")
+    parser.add_argument('-j', '--jobs', type=int, default=None, dest='workers',
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help="width and height of the drawing")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_jobs(args.job_file)
+    except (OSError, ValueError, KeyError) as e:
+        print("cannot read %s: %s" % (args.job_file, e), file=sys.stderr)
+        return 2
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    num_shapes = 0
+    failed = 0
+    for result in run_jobs(jobs, args.out_dir, args.size, args.workers):
+        if result['error'] is None:
+            num_shapes += result['shapes']
+            print("job %d: %s, %d shape(s) in %.1f ms"
+                  % (result['number'], result['output'], result['shapes'], result['seconds'] * 1000))
+        else:
+            failed += 1
+            print("job %d: %s FAILED: %s" % (result['number'], result['output'], result['error']))
+    elapsed = time.perf_counter() - start
+
+    done = len(jobs) - failed
+    print("%d of %d jobs rendered, %d shapes in %.2f s (%.1f jobs/s, %.1f shapes/s)"
+          % (done, len(jobs), num_shapes, elapsed, done / elapsed if elapsed else 0.0,
+             num_shapes / elapsed if elapsed else 0.0))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from array import array
+import shapes
+from shapes import Angle, Polygon, Web
+from renderers import SegmentListRenderer, TkRenderer
+
+"""
+This benchmark.py file times the geometry and rendering hot paths:
+Angle.populate_points, Angle.draw_curve, Polygon.fill_polygon (3 to 12
+sides), Web.get_intersection (and intersect_lines solving 1000 axes in
+one batch), and Web.fill_web, for segment counts from
+10 to 100,000. The drawing benchmarks run against the in-memory
+SegmentListRenderer and, when a display is available, a real Tk canvas.
+
+The results are written as JSON. Given the JSON of an earlier run with
+--baseline, every case slower than the baseline by more than --threshold
+is reported as a regression and the exit status is 1.
+
+usage: python benchmark.py -o results.json
+       python benchmark.py --baseline results.json --threshold 0.1
+
+"""
+
+SEGMENT_COUNTS = [10, 100, 1000, 10000, 100000]
+POLYGON_SIDES = [3, 4, 6, 8, 12]
+ANGLE = [(40, 60), (250, 450), (460, 80)]
+WEB = [(250, 10), (240, 490), (10, 260), (490, 240)]
+
+
+def regular_polygon(sides, radius=200, center=(250, 250)):
+    return [(center[0] + radius * math.cos(2 * math.pi * i / sides),
+             center[1] + radius * math.sin(2 * math.pi * i / sides)) for i in range(sides)]
+
+
+def time_case(run, repeat, setup=None):
+    """
+    Calls run() repeat times and returns the median and the best
+    time in seconds. setup(), if given, is called untimed before each run.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times)
+
+
+def repeat_for(segments):
+    if segments >= 100000:
+        return 3
+    if segments >= 10000:
+        return 5
+    return 20
+
+
+def make_backends(use_tk):
+    """
+    returns a list of (name, make_renderer, after_draw) for the backends
+    to run the drawing benchmarks against. The Tk backend is skipped when
+    tkinter cannot open a window.
+    """
+    backends = [('segments', SegmentListRenderer, None)]
+    if use_tk:
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as e:  # no display, or no Tk at all
+            print("skipping the Tk backend: %s" % e, file=sys.stderr)
+        else:
+            canvas = tk.Canvas(root, width=500, height=500)
+            canvas.grid()
+
+            def make_tk():
+                canvas.delete('all')
+                return TkRenderer(canvas)
+
+            backends.append(('tk', make_tk, root.update_idletasks))
+    return backends
+
+
+def run_benchmarks(segment_counts, use_tk=True):
+    """
+    Runs every benchmark and returns a dict of results keyed by case name.
+    The geometry caches are cleared before every run, so the geometry is
+    really computed each time.
+    """
+    results = {}
+
+    def record(name, bench, backend, segments, timing, **extra):
+        results[name] = dict(bench=bench, backend=backend, segments=segments,
+                             median=timing[0], best=timing[1], **extra)
+        print("%-45s median %10.3f ms   best %10.3f ms" % (name, timing[0] * 1000, timing[1] * 1000))
+
+    backends = make_backends(use_tk)
+    for segments in segment_counts:
+        repeat = repeat_for(segments)
+        angle = Angle(ANGLE, segments, 'black')
+        timing = time_case(lambda: angle.populate_points(ANGLE[0], ANGLE[1]), repeat, shapes.clear_caches)
+        record('populate_points[n=%d]' % segments, 'populate_points', None, segments, timing)
+
+        line1 = angle.populate_points(ANGLE[0], ANGLE[1])
+        line2 = angle.populate_points(ANGLE[1], ANGLE[2])
+        for backend, make_renderer, after_draw in backends:
+            def draw_curve():
+                angle.draw_curve(line1, line2, make_renderer())
+                if after_draw is not None:
+                    after_draw()
+            record('draw_curve[%s, n=%d]' % (backend, segments), 'draw_curve', backend, segments,
+                   time_case(draw_curve, repeat))
+
+            for sides in POLYGON_SIDES:
+                polygon = Polygon(regular_polygon(sides), segments, 'black')
+
+                def fill_polygon():
+                    polygon.fill_polygon(make_renderer())
+                    if after_draw is not None:
+                        after_draw()
+                record('fill_polygon[%s, sides=%d, n=%d]' % (backend, sides, segments), 'fill_polygon',
+                       backend, segments, time_case(fill_polygon, repeat, shapes.clear_caches), sides=sides)
+
+            web = Web(WEB, segments, 'black')
+
+            def fill_web():
+                web.fill_web(make_renderer())
+                if after_draw is not None:
+                    after_draw()
+            record('fill_web[%s, n=%d]' % (backend, segments), 'fill_web', backend, segments,
+                   time_case(fill_web, repeat, shapes.clear_caches))
+
+    def intersections():
+        for _ in range(1000):
+            Web.get_intersection(*WEB)
+    record('get_intersection[x1000]', 'get_intersection', None, None, time_case(intersections, 20))
+
+    lines1 = array('d', [value for point in WEB[0:2] for value in point]) * 1000
+    lines2 = array('d', [value for point in WEB[2:4] for value in point]) * 1000
+    record('intersect_lines[x1000]', 'intersect_lines', None, None,
+           time_case(lambda: shapes.intersect_lines(lines1, lines2), 20))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints how every case compares with the baseline and returns the
+    names of the cases whose median got slower by more than threshold.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['median']
+        after = result['median']
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print("%-45s %10.3f ms -> %10.3f ms  %+7.1f%%%s" % (name, before * 1000, after * 1000, change * 100, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the parabolic curve geometry and rendering.")
+    parser.add_argument('-o', '--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slowdown over the baseline that counts as a regression (default 0.10 = 10%%)")
+    parser.add_argument('--max-segments', type=int, default=SEGMENT_COUNTS[-1],
+                        help="leave out the segment counts above this one")
+    parser.add_argument('--no-tk', action='store_true', help="do not benchmark the Tk canvas")
+    args = parser.parse_args(argv)
+
+    segment_counts = [n for n in SEGMENT_COUNTS if n <= args.max_segments]
+    results = run_benchmarks(segment_counts, use_tk=not args.no_tk)
+    report = {'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                       'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as base:
+            baseline = json.load(base)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("%d case(s) regressed by more than %.0f%%" % (len(regressions), args.threshold * 100))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+"""
+the geometry_cache.py file contains the LRUCache class that shapes.py uses
+to remember the points and chords it has already computed, so that drawing
+an unchanged shape again (for example in a new color) skips the geometry.
+
+"""
+
+
+class LRUCache:
+    """
+    A bounded cache that evicts the least recently used entries first.
+    Every entry has a cost (for geometry, the number of floats it holds) and
+    the total cost of the entries is kept at or below maxsize. Counts its
+    hits and misses.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key -> (value, cost)
+        self.total_cost = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        returns the value stored for key, or None if there is none.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def get_any(self, keys):
+        """
+        returns a (key, value) pair for the first of the keys that is
+        stored, or (None, None) if none of them is. Counts one hit or miss.
+        """
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return key, entry[0]
+        self.misses += 1
+        return None, None
+
+    def put(self, key, value, cost=1):
+        """
+        stores value for key. A value costing more than the whole
+        cache is not stored.
+        """
+        if key in self.entries:
+            self.total_cost -= self.entries.pop(key)[1]
+        if cost > self.maxsize:
+            return
+        self.entries[key] = (value, cost)
+        self.total_cost += cost
+        self.evict()
+
+    def evict(self):
+        """
+        drops the least recently used entries until the cache fits in maxsize.
+        """
+        while self.total_cost > self.maxsize:
+            key, (value, cost) = self.entries.popitem(last=False)
+            self.total_cost -= cost
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        self.evict()
+
+    def clear(self):
+        """
+        empties the cache and resets the counters.
+        """
+        self.entries.clear()
+        self.total_cost = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        returns a dict with the hits, misses, number of entries,
+        total cost, and maxsize of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries),
+                'cost': self.total_cost, 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,44 +1,102 @@
-import tkinter as tk
-from tkinter import messagebox
-from tkinter import colorchooser
-from tkinter import ttk
-from shapes import Circle, Angle, Polygon, Web
+import time
+STARTED = time.perf_counter()  # start of the cold start, reported once the window is up
+import argparse
+import sys
+from shapes import AXES_PROBLEMS, MarkerPool, Angle, Polygon, Web
+from viewport import Viewport
+from animation import Animation, ItemRenderer, color_cycle, orbit, ping_pong, updater
+from scene import Scene
+from profiling import DrawProfiler
+from progressive import ProgressiveDraw
+from views import ViewManager
+import os
 import random
+import re
 
 """
 This parabolic_curves.py file contains the GUI that interacts with the user.
-Draws instances of Angle, Polygon, Web, and Circle shapes to the canvas
+Draws instances of Angle, Polygon, and Web shapes to the canvas
 based on user input. 
 
 """
 
 CANVAS_SIZE = 500
+WORLD_SIZE = 5000  # the drawing is WORLD_SIZE units square; the canvas shows part of it
+ZOOM_STEP = 1.25  # zoom factor of one mouse wheel step
+WORLD_BOUNDS = (0, 0, WORLD_SIZE - 1, WORLD_SIZE - 1)
+ANIMATION_RADIUS = 15  # how far the vertices of an animated shape wander, in drawing units
+ANIMATION_PERIOD = 4.0  # seconds for one sweep of the segments and colors
+FRAME_MS = 16  # the status bar is updated at most once per frame (about 60 times a second)
+PROGRESSIVE_MIN_CHORDS = 2000  # smaller shapes are always drawn in one go
+SCENE_EXTENSION = '.pcs'
+PNG_SIZE = WORLD_SIZE  # default width and height of an exported PNG, in pixels: one per unit
+
+# tkinter is only imported by load_tkinter() once the GUI starts, so
+# importing this module for its constants does not pay for it
+tk = messagebox = colorchooser = filedialog = simpledialog = ttk = None
+tkinter_import_seconds = None
+
+
+def load_tkinter():
+    """
+    Imports tkinter and the dialogs the GUI uses, the first time it is called.
+    """
+    global tk, messagebox, colorchooser, filedialog, simpledialog, ttk, tkinter_import_seconds
+    if tk is not None:
+        return
+    start = time.perf_counter()
+    import tkinter as tk
+    from tkinter import messagebox
+    from tkinter import colorchooser
+    from tkinter import filedialog
+    from tkinter import simpledialog
+    from tkinter import ttk
+    tkinter_import_seconds = time.perf_counter() - start
+
+
+def parse_vertices(text):
+    """
+    reads a list of vertices from text: x, y pairs of numbers separated by
+    commas, spaces, semicolons, or new lines, with any brackets or
+    parentheses ignored, so "10, 20" lines, CSV, and JSON lists all work.
+    returns a list of (x, y) tuples. Raises ValueError if a value is not a
+    number or a pair is incomplete.
+    """
+    values = [float(value) for value in re.findall(r'[^\s,;()\[\]]+', text)]
+    if len(values) % 2:
+        raise ValueError('the last vertex has no y value')
+    return list(zip(values[0::2], values[1::2]))
 
 
 class MainApp:
     # class variable
     mouse_click_counter = 0
 
-    def __init__(self, master):
+    def __init__(self, master, started=None):
+        """
+        master: the Tk root window
+        started: perf_counter() time the cold start is measured from,
+        by default the time this module was imported
+        """
+        load_tkinter()
+        self.started = STARTED if started is None else started
+        build_start = time.perf_counter()
+        self.startup = None  # the cold start times, once the window is up
         self.temp_clicked_values = []
-        self.lines_of_poly_widgets = []  # for clicked poly
 
         # holds the labels that update to show user clicked input
         self.angle_vertices_labels = []
-        self.poly_vertices_labels = []
         self.web_vertices_labels = []
         # holds the user input boxes for typed input
         self.angle_vertices_entries = []
-        self.poly_vertices_entries = []
         self.web_vertices_entries = []
-
-        self.poly_each_vertex_labels = []
+        # polygons can have any number of vertices, so they are typed into one text box
+        # and listed in one list box when clicked, see build_toggled_frame
+        self.poly_text = None
+        self.poly_vertices_list = None
 
         self.web_msgs = ["Top of y-axis: ", "Bottom of y-axis: ", "Left of x-axis: ", "Right of x-axis: "]
 
-        self.circle_ids = Circle.get_all_circles()
-        self.label_ids = Circle.get_all_labels()
-
         # GUI elements
         self.master = master
         self.master.title("Parabolic Curves")
@@ -47,11 +105,36 @@ class MainApp:
         self.base_frame2 = tk.Frame(self.master)
 
         self.canvas = tk.Canvas(self.base_frame1, width=CANVAS_SIZE, height=CANVAS_SIZE, bg="white")
+        # the shapes draw to the canvas through a zoomable view of the drawing,
+        # which only puts the chords in view on the canvas
+        self.viewport = Viewport(self.canvas, CANVAS_SIZE, CANVAS_SIZE, WORLD_SIZE, WORLD_SIZE)
+        self.renderer = self.viewport
+        # the circles marking the clicked vertices; they belong to this canvas and are reused
+        self.markers = MarkerPool(self.canvas, self.viewport)
+        self.view_after_id = None  # id of the pending redraw of the view, if any
+        self.drawn_zoom = self.viewport.zoom  # the zoom the scaled shapes were last drawn at
+        self.pan_start = None
+        self.selected_shape = None  # the shape shift-clicked last, if any
+        self.animation = None  # the running Animation, if any
+        self.animated_shape = None  # the scene shape the animation stands in for
+        # every shape drawn is kept in the scene, so it can be changed later
+        self.scene = Scene(self.renderer)
+        # times every draw while profiling is switched on
+        self.profiler = DrawProfiler()
+        self.progressive_draw = None  # the progressive draw in progress, if any
 
         self.base_frame1.grid(row=0, column=0)
         self.base_frame2.grid(row=0, column=1)
         self.canvas.grid(row=0, column=0)
-        self.instantiate_circles()
+        # the one click handler; it ignores clicks unless an input frame is in clicked mode
+        self.canvas.bind('<Button-1>', self.handle_mouse_clicks)
+        # shift-click selects a shape, the mouse wheel zooms, and dragging with the right button pans
+        self.canvas.bind('<Shift-Button-1>', self.select_shape)
+        self.canvas.bind('<MouseWheel>', self.zoom_view)
+        self.canvas.bind('<Button-4>', self.zoom_view)
+        self.canvas.bind('<Button-5>', self.zoom_view)
+        self.canvas.bind('<ButtonPress-3>', self.start_pan)
+        self.canvas.bind('<B3-Motion>', self.drag_pan)
         self.create_shape_controls()
         self.create_input_controls()
         self.create_toggled_frames()
@@ -59,11 +142,22 @@ class MainApp:
         self.create_status_bar()
         self.mouse_click_counter = 0
         self.color = 'black'  # default color
+        self.build_seconds = time.perf_counter() - build_start
+        self.master.after_idle(self.report_startup)
+
+    def report_startup(self):
+        """
+        Records the cold start time, up to the first idle moment of the
+        event loop, and shows it in the status bar.
+        """
+        self.startup = {'total': time.perf_counter() - self.started,
+                        'tkinter import': tkinter_import_seconds or 0.0,
+                        'widgets': self.build_seconds}
+        self.status_bar_text.set(self.startup_summary())
 
-    def instantiate_circles(self):
-        self.angle_circle = Circle(self.canvas)
-        self.poly_circle = Circle(self.canvas)
-        self.web_circle = Circle(self.canvas)
+    def startup_summary(self):
+        return "Started in %.0f ms (tkinter import %.0f ms, widgets %.0f ms)" % (
+            self.startup['total'] * 1000, self.startup['tkinter import'] * 1000, self.startup['widgets'] * 1000)
 
     def create_shape_controls(self):
         # 1. Choose shape
@@ -128,71 +222,99 @@ class MainApp:
         self.container_frame = tk.Frame(self.base_frame2)
         self.container_frame.grid(row=2, column=0)
 
-        self.angle_typed_frame = tk.Frame(self.container_frame)
-        self.angle_clicked_frame = tk.Frame(self.container_frame)
-        self.poly_typed_frame = tk.Frame(self.container_frame)
-        self.poly_clicked_frame = tk.Frame(self.container_frame)
-        self.web_typed_frame = tk.Frame(self.container_frame)
-        self.web_clicked_frame = tk.Frame(self.container_frame)
-
-        # sort frames into lists by typed or clicked
-        self.toggled_frames_typed = [self.angle_typed_frame, self.poly_typed_frame, self.web_typed_frame]
-        self.toggled_frames_clicked = [self.angle_clicked_frame, self.poly_clicked_frame, self.web_clicked_frame]
-
-        for i in range(3):
-            # create labels for each of the six frames
-            t_label = tk.Label(self.toggled_frames_typed[i], text="Enter Vertices")
-            c_label = tk.Label(self.toggled_frames_clicked[i], text="Click to Enter Vertices")
-            xy = tk.Label(self.toggled_frames_typed[i], text="(x, y)")
-            xy2 = tk.Label(self.toggled_frames_clicked[i], text="(x, y)")
-
-            # grid labels to frame
-            t_label.grid(row=0, columnspan=3)
-            c_label.grid(row=0, columnspan=3)
-            xy.grid(row=1, column=1, columnspan=2)
-            xy2.grid(row=1, column=1, columnspan=2)
-
-        # create angle frames widgets
-        self.create_typed_widgets(3, self.angle_typed_frame, self.angle_vertices_entries, False)
-        self.create_clicked_widgets(3, self.angle_clicked_frame, self.angle_vertices_labels, False)
-        # create web frames widgets
-        self.create_typed_widgets(4, self.web_typed_frame, self.web_vertices_entries, True)
-        self.create_clicked_widgets(4, self.web_clicked_frame, self.web_vertices_labels, True)
-
-        # polygons: Entry boxes get created only after user enters # sides for the polygon (calls enter_poly_sides_num)
-        self.poly_sides_label = tk.Label(self.poly_typed_frame, text="Enter the number of \nsides in polygon: ")
-        self.poly_sides_entry = tk.Entry(self.poly_typed_frame, width=5, validate="key")
-        self.poly_sides_entry.configure(validatecommand=(self.poly_sides_entry.register(self.validate_input), '%P', '%d'))
-        self.poly_sides_button = tk.Button(self.poly_typed_frame, text="Submit",
-                                           command=lambda: self.enter_poly_sides_num())
-
-        self.poly_sides_label.grid(row=0, column=0)
-        self.poly_sides_entry.grid(row=0, column=1)
-        self.poly_sides_button.grid(row=0, column=2)
+        # the frames are only built the first time they are shown, see build_toggled_frame
+        self.views = ViewManager(lambda key: self.build_toggled_frame(*key))
+        self.angle_typed_frame = None
+        self.angle_clicked_frame = None
+        self.poly_typed_frame = None
+        self.poly_clicked_frame = None
+        self.web_typed_frame = None
+        self.web_clicked_frame = None
 
         # have the angle typed frame be default
-        self.angle_typed_frame.grid()
+        self.views.show((self.shape_svar.get(), self.input_svar.get()))
 
-    def enter_poly_sides_num(self):
+    def build_toggled_frame(self, shape_, input_):
         """
-        Gets user input for the number of sides of polygon
-        Draws the polygon only if the user has entered a number
-        between 3 and 12
+        Creates the input frame for the shape and input style given, with
+        its widgets. Called by self.views the first time the frame is shown.
         """
-        text = self.poly_sides_entry.get()
-        if text == '':
-            messagebox.showwarning(title="Nothing Entered", message="Please enter a value.")
+        frame = tk.Frame(self.container_frame)
+        setattr(self, '%s_%s_frame' % (shape_, input_), frame)
+
+        # create the labels of the frame
+        if input_ == 'typed':
+            tk.Label(frame, text="Enter Vertices").grid(row=0, columnspan=3)
         else:
-            num_vertices = int(text)
-            if num_vertices < 3:
-                messagebox.showwarning(title="Improper Polygon", message="A polygon must have at least 3 vertices.")
-            elif num_vertices > 12:
-                messagebox.showwarning(title="Improper Polygon", message="A dodecagon is the greatest you can draw!")
+            tk.Label(frame, text="Click to Enter Vertices").grid(row=0, columnspan=3)
+        tk.Label(frame, text="(x, y)").grid(row=1, column=1, columnspan=2)
+
+        if shape_ == 'angle':
+            if input_ == 'typed':
+                self.create_typed_widgets(3, frame, self.angle_vertices_entries, False)
+            else:
+                self.create_clicked_widgets(3, frame, self.angle_vertices_labels, False)
+        elif shape_ == 'web':
+            if input_ == 'typed':
+                self.create_typed_widgets(4, frame, self.web_vertices_entries, True)
             else:
-                # clear the previously existing widgets on the poly_frame every time user enters a new number of sides
-                self.clear_polygon_widgets()
-                self.create_typed_widgets(num_vertices, self.poly_typed_frame,
-                                          self.poly_vertices_entries, False)
+                self.create_clicked_widgets(4, frame, self.web_vertices_labels, True)
+        elif input_ == 'typed':
+            # polygons: the vertices are typed or pasted into a scrolling text box, or imported from a file
+            self.poly_text = tk.Text(frame, width=16, height=12)
+            poly_scrollbar = tk.Scrollbar(frame, orient='vertical', command=self.poly_text.yview)
+            self.poly_text.configure(yscrollcommand=poly_scrollbar.set)
+            poly_import_button = tk.Button(frame, text="Import...", command=self.import_poly_vertices)
+
+            self.poly_text.grid(row=2, column=0, columnspan=2)
+            poly_scrollbar.grid(row=2, column=2, sticky='ns')
+            poly_import_button.grid(row=3, column=0, columnspan=3, pady=5)
+        else:
+            # clicked polygons: one line of the list box per click
+            self.poly_vertices_list = tk.Listbox(frame, width=16, height=12)
+            poly_scrollbar = tk.Scrollbar(frame, orient='vertical', command=self.poly_vertices_list.yview)
+            self.poly_vertices_list.configure(yscrollcommand=poly_scrollbar.set)
+
+            self.poly_vertices_list.grid(row=2, column=0, columnspan=2)
+            poly_scrollbar.grid(row=2, column=2, sticky='ns')
+        return frame
+
+    def import_poly_vertices(self):
+        """
+        Fills the polygon text box with the vertices of a text, CSV, or JSON file.
+        """
+        path = filedialog.askopenfilename(title="Import vertices",
+                                          filetypes=[("Coordinate lists", "*.txt *.csv *.json"),
+                                                     ("All files", "*")])
+        if path:
+            try:
+                with open(path) as vertex_file:
+                    text = vertex_file.read()
+            except (OSError, UnicodeDecodeError) as e:
+                messagebox.showwarning(title="Import Failed", message=str(e))
+                return
+            self.poly_text.delete('1.0', 'end')
+            self.poly_text.insert('1.0', text)
+
+    def read_poly_text(self):
+        """
+        returns the vertices typed into the polygon text box as a list of
+        (x, y) tuples, or None after warning the user if they are not valid.
+        """
+        try:
+            vertices = parse_vertices(self.poly_text.get('1.0', 'end'))
+        except ValueError:
+            messagebox.showwarning(title="Invalid Entry",
+                                   message="Please enter an x, y pair of numbers for each vertex.")
+            return None
+        if len(vertices) < 3:
+            messagebox.showwarning(title="Improper Polygon", message="A polygon must have at least 3 vertices.")
+            return None
+        for x, y in vertices:
+            if not (0 <= x < WORLD_SIZE and 0 <= y < WORLD_SIZE):
+                messagebox.showwarning(title="Invalid Entry", message="(%g, %g) is not on the canvas." % (x, y))
+                return None
+        return vertices
 
     def create_typed_widgets(self, num_vertices, frame, entries_list, is_web):
         """
@@ -204,9 +326,6 @@ class MainApp:
             if is_web:
                 new_label.config(text=self.web_msgs[v])
             new_label.grid(row=v + 2, column=0)
-            if self.shape_svar.get() == 'poly':
-                # store the side labels for polygons because a user may resubmit the # side before drawing or clearing
-                self.poly_each_vertex_labels.append(new_label)
 
             entry_x = tk.Entry(frame, width=4, validate="key")
             entry_x.configure(validatecommand=(entry_x.register(self.validate_input), '%P', '%d'))
@@ -232,43 +351,6 @@ class MainApp:
             new_label.grid(row=v + 2, column=0)
             xy_label.grid(row=v + 2, column=1, columnspan=2)
 
-    def create_line_of_widgets(self, mouse_click_counter_):
-        """
-        Creates widgets for poly clicked frame.
-        One line of Enter Vertex: label and blank label to hold the coordinates
-        for the polygon_clicked_frame
-        """
-        new_label = tk.Label(self.poly_clicked_frame, text="Enter vertex: " + str(mouse_click_counter_ + 1))
-        xy_label = tk.Label(self.poly_clicked_frame, text='')
-        self.poly_vertices_labels.append(xy_label)
-        self.lines_of_poly_widgets.append(new_label)
-
-        new_label.grid(row=mouse_click_counter_ + 2, column=0)
-        xy_label.grid(row=mouse_click_counter_ + 2, column=1, columnspan=2)
-
-    def clear_polygon_widgets(self):
-        """
-        Destroys all widgets (Vertex #: -- -- )
-        on the poly frame so that they can be recreated with
-        a different number each time, also clears the lists that
-        they're held in
-        """
-        # destroys the x and y input Entry boxes
-        for entry in self.poly_vertices_entries:
-            entry[0].destroy()
-            entry[1].destroy()
-        # clears the list that holds the entry boxes
-        self.poly_vertices_entries.clear()
-        # destroys the "(x, y)" user input values labels
-        for entry in self.poly_vertices_labels:
-            entry.destroy()
-        self.poly_vertices_labels.clear()
-        # destroy the "Vertex 1:, Vertex 2:.." labels to the sides of the Entry boxes
-        for entry in self.poly_each_vertex_labels:
-            entry.destroy()
-        self.poly_each_vertex_labels.clear()
-
-
     def create_buttons(self):
         """
         Creates the buttons to choose color, choose number
@@ -290,6 +372,12 @@ class MainApp:
         self.draw_button = tk.Button(self.buttons_frame, text="Draw", width=10,
                                      command=lambda: self.draw_btn_clicked(self.shape_svar.get(), self.input_svar.get()))
         self.clear_button = tk.Button(self.buttons_frame, text="Clear canvas", width=10, command=self.clear_canvas)
+        # buttons that change only the shape drawn last
+        self.undo_button = tk.Button(self.buttons_frame, text="Undo", width=10, command=self.undo_last_shape)
+        self.recolor_button = tk.Button(self.buttons_frame, text="Recolor last", width=10,
+                                        command=self.recolor_last_shape)
+        self.resegment_button = tk.Button(self.buttons_frame, text="Re-segment last", width=12,
+                                          command=self.resegment_last_shape)
 
         self.buttons_frame.grid(row=3, column=0)
         # self.buttons_frame.pack()
@@ -300,14 +388,73 @@ class MainApp:
         self.color_label.grid(row=3, column=0, columnspan=2, pady=5, padx=5)
         self.draw_button.grid(row=4, column=0, pady=10, padx=5)
         self.clear_button.grid(row=4, column=1, pady=10, padx=5)
+        self.undo_button.grid(row=5, column=0, pady=5, padx=5)
+        self.recolor_button.grid(row=5, column=1, pady=5, padx=5)
+        self.resegment_button.grid(row=6, column=0, columnspan=2, pady=5, padx=5)
+
+        # profiling can be switched on and off while the app runs
+        self.profile_on_off = tk.IntVar()
+        self.profile_checkbox = tk.Checkbutton(self.buttons_frame, text="Profile drawing",
+                                               variable=self.profile_on_off, command=self.toggle_profiling)
+        self.trace_button = tk.Button(self.buttons_frame, text="Export trace", width=10, command=self.export_trace)
+        self.profile_checkbox.grid(row=7, column=0, pady=5, padx=5)
+        self.trace_button.grid(row=7, column=1, pady=5, padx=5)
+
+        # big shapes can be drawn a chunk at a time, keeping the window responsive
+        self.progressive_on_off = tk.IntVar()
+        self.progressive_on_off.set(1)
+        self.progressive_checkbox = tk.Checkbutton(self.buttons_frame, text="Draw progressively",
+                                                   variable=self.progressive_on_off)
+        self.progress_bar = ttk.Progressbar(self.buttons_frame, orient='horizontal', length=120,
+                                            mode='determinate', maximum=100)
+        self.progressive_checkbox.grid(row=8, column=0, pady=5, padx=5)
+        self.progress_bar.grid(row=8, column=1, pady=5, padx=5)
+
+        # level of detail leaves out chords closer together than a pixel
+        self.lod_on_off = tk.IntVar()
+        self.lod_checkbox = tk.Checkbutton(self.buttons_frame, text="Level of detail", variable=self.lod_on_off)
+        self.lod_label = tk.Label(self.buttons_frame, text='')
+        self.lod_checkbox.grid(row=9, column=0, pady=5, padx=5)
+        self.lod_label.grid(row=9, column=1, pady=5, padx=5)
+
+        self.export_button = tk.Button(self.buttons_frame, text="Export...", width=10, command=self.export_drawing)
+        self.export_button.grid(row=10, column=0, columnspan=2, pady=5, padx=5)
+
+        self.save_button = tk.Button(self.buttons_frame, text="Save scene...", width=10, command=self.save_scene)
+        self.save_button.grid(row=11, column=0, pady=5, padx=5)
+        self.open_button = tk.Button(self.buttons_frame, text="Open scene...", width=10, command=self.open_scene)
+        self.open_button.grid(row=11, column=1, pady=5, padx=5)
+
+        # envelope mode draws only the smooth curve each set of chords is tangent to
+        self.envelope_on_off = tk.IntVar()
+        self.envelope_checkbox = tk.Checkbutton(self.buttons_frame, text="Envelope only",
+                                                variable=self.envelope_on_off)
+        self.envelope_checkbox.grid(row=12, column=0, pady=5, padx=5)
+
+        self.reset_view_button = tk.Button(self.buttons_frame, text="Reset view", width=10, command=self.reset_view)
+        self.reset_view_button.grid(row=12, column=1, pady=5, padx=5)
+
+        # animates the selected shape, or the one drawn last, moving its canvas items in place
+        self.animate_button = tk.Button(self.buttons_frame, text="Animate", width=10, command=self.toggle_animation)
+        self.animation_label = tk.Label(self.buttons_frame, text='')
+        self.animate_button.grid(row=13, column=0, pady=5, padx=5)
+        self.animation_label.grid(row=13, column=1, pady=5, padx=5)
 
 
     def create_status_bar(self):
         self.status_bar_text = tk.StringVar()
         self.mouse_location = tk.StringVar()
+        self.mouse_xy = (0, 0)
+        self.statusbar_after_id = None  # id of the pending status bar update, if any
+        # register the status bar update once; every write to mouse_location runs it
+        self.mouse_location.trace_add('write', self.update_statusbar)
         self.canvas.bind("<Motion>", self.track_mouse)
         self.status_bar = tk.Label(self.master, textvariable=self.status_bar_text, bd=1, relief='sunken', anchor='w')
         self.status_bar.grid(row=1, columnspan=2, sticky='ew')
+        # shows the timings of the last draw while profiling is on
+        self.profile_text = tk.StringVar()
+        self.profile_bar = tk.Label(self.master, textvariable=self.profile_text, bd=1, relief='sunken', anchor='w')
+        self.profile_bar.grid(row=2, columnspan=2, sticky='ew')
 
     """
      ****************************
@@ -327,63 +474,28 @@ class MainApp:
 
     def clear_circles(self):
         """
-        Checks if there are any circle objects on the canvas
-        and deletes them
+        Hides the circles of the clicked vertices, keeping them for the next clicks.
         """
-        if len(self.circle_ids) > 0:
-            for i in range(len(self.circle_ids)):
-                self.canvas.delete(self.circle_ids[i])
-                self.canvas.delete(self.label_ids[i])
-        self.circle_ids.clear()
-        self.label_ids.clear()
+        self.markers.clear()
 
     def toggle_input_view(self, shape_rb, input_rb):
         """
-        toggles between the six input view frames
+        toggles between the six input view frames;
+        only the frame shown and the new one are touched
         """
-        # reset mouse_click_counter to 0
-        self.mouse_click_counter = 0
-        # clear circles from canvas, if any
-        self.clear_circles()
-
-        if input_rb == 'typed':
-            self.angle_clicked_frame.grid_forget()
-            self.poly_clicked_frame.grid_forget()
-            self.web_clicked_frame.grid_forget()
-            if shape_rb == 'angle':
-                self.angle_typed_frame.grid()
-                self.poly_typed_frame.grid_forget()
-                self.web_typed_frame.grid_forget()
-            elif shape_rb == 'poly':
-                self.angle_typed_frame.grid_forget()
-                self.poly_typed_frame.grid()
-                self.web_typed_frame.grid_forget()
-            else:  # shape_rb == 'web'
-                self.angle_typed_frame.grid_forget()
-                self.poly_typed_frame.grid_forget()
-                self.web_typed_frame.grid()
-
-        else:  # if input_rb == 'clicked':
-            # bind mouse click actions to the canvas
-            self.canvas.bind('<Button-1>', lambda event: self.handle_mouse_clicks(event))
-            self.angle_typed_frame.grid_forget()
-            self.poly_typed_frame.grid_forget()
-            self.web_typed_frame.grid_forget()
-            if shape_rb == 'angle':
-                self.angle_clicked_frame.grid()
-                self.poly_clicked_frame.grid_forget()
-                self.web_clicked_frame.grid_forget()
-            elif shape_rb == 'poly':
-                self.angle_clicked_frame.grid_forget()
-                self.poly_clicked_frame.grid()
-                self.web_clicked_frame.grid_forget()
-            else:  # shape_rb == 'web'
-                self.angle_clicked_frame.grid_forget()
-                self.poly_clicked_frame.grid_forget()
-                self.web_clicked_frame.grid()
+        if self.views.show((shape_rb, input_rb)):
+            # reset mouse_click_counter to 0
+            self.mouse_click_counter = 0
+            # clear circles from canvas, if any
+            self.clear_circles()
+            # and forget the vertices clicked so far
+            self.temp_clicked_values.clear()
+            if self.poly_vertices_list is not None:
+                self.poly_vertices_list.delete(0, 'end')
 
     def handle_mouse_clicks(self, event):
-        x, y = event.x, event.y
+        # the vertices are kept in drawing coordinates, wherever the view is
+        x, y = (round(value) for value in self.viewport.to_world(event.x, event.y))
 
         if self.input_svar.get() == 'clicked' and self.shape_svar.get() == 'angle':
             if self.mouse_click_counter < 3:
@@ -391,29 +503,24 @@ class MainApp:
                 # update the labels as mouse is clicked
                 self.angle_vertices_labels[self.mouse_click_counter - 1].config(text="(%d, %d)" % (x, y))
                 self.temp_clicked_values.append((x, y))
-                # draw the circle object to the canvas
-                self.angle_circle.set_text('P' + str(self.mouse_click_counter))
-                self.angle_circle.set_color('blue')
-                self.angle_circle.draw_circle(event)
+                # mark the vertex on the canvas
+                self.markers.show(x, y, 'P' + str(self.mouse_click_counter), 'blue')
         elif self.input_svar.get() == 'clicked' and self.shape_svar.get() == 'poly':
-            if self.mouse_click_counter < 12:
-                self.create_line_of_widgets(self.mouse_click_counter)
-                self.mouse_click_counter += 1
-                # update the labels as mouse is clicked
-                self.poly_vertices_labels[self.mouse_click_counter - 1].config(text="(%d, %d)" % (x, y))
-                self.temp_clicked_values.append([x, y])
-                self.poly_circle.set_text('P' + str(self.mouse_click_counter))
-                self.poly_circle.set_color('red')
-                self.poly_circle.draw_circle(event)
+            # a polygon takes any number of clicks
+            self.mouse_click_counter += 1
+            # list the vertex as mouse is clicked
+            self.poly_vertices_list.insert('end', "P%d: (%d, %d)" % (self.mouse_click_counter, x, y))
+            self.poly_vertices_list.see('end')
+            self.temp_clicked_values.append([x, y])
+            self.markers.show(x, y, 'P' + str(self.mouse_click_counter), 'red')
         elif self.input_svar.get() == 'clicked' and self.shape_svar.get() == 'web':
-            if self.mouse_click_counter < 4:
-                self.mouse_click_counter += 1
+            # the first four clicks are the ends of the axes, any more add spokes to make a star
+            self.mouse_click_counter += 1
+            if self.mouse_click_counter <= 4:
                 # update the labels as mouse is clicked
                 self.web_vertices_labels[self.mouse_click_counter - 1].config(text="(%d, %d)" % (x, y))
-                self.temp_clicked_values.append([x, y])
-                self.web_circle.set_text('P' + str(self.mouse_click_counter))
-                self.web_circle.set_color('green')
-                self.web_circle.draw_circle(event)
+            self.temp_clicked_values.append([x, y])
+            self.markers.show(x, y, 'P' + str(self.mouse_click_counter), 'green')
 
     def draw_btn_clicked(self, shape_, input_):
         """
@@ -422,49 +529,337 @@ class MainApp:
         """
         if input_ == 'typed':
             self.handle_typed_input(shape_)
-            self.clear_polygon_widgets()
-            # neccesary along with .clear_polygon_widgets() to catch the bug
-            # of clicked poly labels not clearing between toggles
-            self.destroy_poly_child_widgets()
         else:
             self.handle_clicked_input(shape_)
-            self.clear_polygon_widgets()
-            self.destroy_poly_child_widgets()
-
-    def destroy_poly_child_widgets(self):
-        children = self.poly_clicked_frame.winfo_children()
-        for child in children:
-            child.destroy()
-        self.poly_vertices_entries.clear()
-        self.poly_each_vertex_labels.clear()
-        self.poly_each_vertex_labels.clear()
 
     def draw_shape(self, shape_, user_input_list_):
         """
         Param: shape specified, list of coordinates
         Draws indicated shape to canvas.
         """
-        if self.segment_entry.get() == '':
-            seg = 20
-        else:
-            seg = int(self.segment_entry.get())
-        if self.random_on_off.get() == 1:
-            self.color = '#' + ''.join([random.choice('0123456789ABCDEF') for i in range(6)])
+        self.set_segments()
+        seg = self.segment
+        self.pick_random_color()
 
         if shape_ == 'angle':
-            new_angle = Angle(user_input_list_, seg, self.color)
-            new_angle.fill_angle(self.canvas)
+            new_shape = Angle(user_input_list_, seg, self.color)
         elif shape_ == 'poly':
-            new_poly = Polygon(user_input_list_, seg, self.color)
-            new_poly.fill_polygon(self.canvas)
+            new_shape = Polygon(user_input_list_, seg, self.color)
         else:
-            new_web = Web(user_input_list_, seg, self.color)
+            new_shape = Web(user_input_list_, seg, self.color, bounds=WORLD_BOUNDS)
             # draw web only if lines intersect on canvas
-            if new_web.get_point_of_int() is None:
+            if new_shape.get_point_of_int() is None:
                 tk.messagebox.showwarning(title="Non-Intersecting Lines",
-                                          message="Your lines do not intersect. Please try again.")
+                                          message="Your web cannot be drawn: %s. Please try again."
+                                                  % AXES_PROBLEMS[new_shape.axes_status])
+                return
+
+        # drawing again cancels a progressive draw that hasn't finished
+        self.cancel_progressive_draw(remove_shape=True)
+        new_shape.lod = self.lod_on_off.get() == 1
+        new_shape.envelope = self.envelope_on_off.get() == 1
+        scale = self.renderer.scale
+        if new_shape.lod:
+            self.lod_label.config(text="skipped %d chords" % new_shape.skipped_chords(scale))
+        else:
+            self.lod_label.config(text='')
+        # an envelope is a single curve per corner, with no chords to draw progressively
+        progressive = (not new_shape.envelope and self.progressive_on_off.get() == 1
+                       and new_shape.chord_count(scale) >= PROGRESSIVE_MIN_CHORDS)
+        self.profiler.start(shape_, seg)
+        if progressive:
+            # the chords are computed step by step as they are drawn,
+            # so not even the geometry of a huge shape holds up the window
+            with self.profiler.phase('emission'):
+                self.scene.track(new_shape)
+                # once done, a redraw merges the items of each curve drawn chunk by chunk
+                self.progressive_draw = ProgressiveDraw(self.master, self.renderer, new_shape, scale,
+                                                        on_progress=self.show_progress,
+                                                        on_done=self.schedule_view_redraw).start()
+        else:
+            with self.profiler.phase('geometry'):
+                families = None if new_shape.envelope else new_shape.chord_families(scale)
+            with self.profiler.phase('emission'):
+                self.scene.add(new_shape, families)
+                self.show_progress(1, 1)
+        if self.profiler.enabled:
+            with self.profiler.phase('tk idle flush'):
+                self.canvas.update_idletasks()
+        record = self.profiler.finish(items=len(new_shape.item_ids),
+                                      chords=0 if new_shape.envelope else new_shape.chord_count(scale))
+        if record is not None:
+            self.profile_text.set(self.profiler.summary(record))
+
+    def pick_random_color(self):
+        """
+        Sets a new random color if the user has checked random color.
+        """
+        if self.random_on_off.get() == 1:
+            self.color = '#' + ''.join([random.choice('0123456789ABCDEF') for i in range(6)])
+
+    def toggle_profiling(self):
+        self.profiler.enabled = self.profile_on_off.get() == 1
+        if self.profiler.enabled:
+            self.profile_text.set("Profiling on: draw a shape to see its timings")
+        else:
+            self.profile_text.set('')
+
+    def export_trace(self):
+        """
+        Saves the timings recorded so far as a trace file.
+        """
+        if not self.profiler.records:
+            messagebox.showinfo(title="Nothing Recorded",
+                                message="Switch on profiling and draw some shapes first.")
+            return
+        path = filedialog.asksaveasfilename(title="Export trace", defaultextension='.json',
+                                            filetypes=[("Trace files", "*.json")])
+        if path:
+            self.profiler.export(path)
+
+    def show_progress(self, done, total):
+        self.progress_bar['value'] = 100 * done / total if total else 100
+
+    def cancel_progressive_draw(self, remove_shape=False):
+        """
+        Stops the progressive draw in progress, if there is one, and
+        optionally removes its unfinished shape.
+        """
+        if self.progressive_draw is not None and self.progressive_draw.is_running():
+            self.progressive_draw.cancel()
+            if remove_shape and self.progressive_draw.shape in self.scene.shapes:
+                self.scene.remove(self.progressive_draw.shape)
+            self.show_progress(0, 1)
+        self.progressive_draw = None
+
+    def export_drawing(self):
+        """
+        Saves every shape of the drawing, in view or not, to an SVG, PDF,
+        PostScript, or PNG file covering the whole WORLD_SIZE square.
+        A PNG is rasterized at the size the user asks for.
+        """
+        if len(self.scene) == 0:
+            messagebox.showinfo(title="Nothing to Export", message="Draw some shapes first.")
+            return
+        path = filedialog.asksaveasfilename(title="Export drawing", defaultextension='.svg',
+                                            filetypes=[("SVG files", "*.svg"), ("PDF files", "*.pdf"),
+                                                       ("PostScript files", "*.eps *.ps"),
+                                                       ("PNG images", "*.png")])
+        if not path:
+            return
+        try:
+            if path.lower().endswith('.png'):
+                size = simpledialog.askinteger("PNG Size", "Width and height of the image in pixels:",
+                                               initialvalue=PNG_SIZE, minvalue=1)
+                if size is not None:
+                    self.scene.export_png(path, size, WORLD_SIZE, workers=os.cpu_count() or 1)
             else:
-                new_web.fill_web(self.canvas)
+                self.scene.export(path, WORLD_SIZE, WORLD_SIZE)
+        except (OSError, ValueError) as e:
+            messagebox.showwarning(title="Export Failed", message=str(e))
+
+    def save_scene(self):
+        """
+        Saves every shape on the canvas, with its curves, to a scene file.
+        """
+        if len(self.scene) == 0:
+            messagebox.showinfo(title="Nothing to Save", message="Draw some shapes first.")
+            return
+        path = filedialog.asksaveasfilename(title="Save scene", defaultextension=SCENE_EXTENSION,
+                                            filetypes=[("Scene files", "*" + SCENE_EXTENSION)])
+        if path:
+            # a shape still being drawn progressively is saved whole, as its chords are computed again
+            try:
+                self.scene.save(path)
+            except OSError as e:
+                messagebox.showwarning(title="Save Failed", message=str(e))
+
+    def open_scene(self):
+        """
+        Replaces the drawing with the shapes of a scene file.
+        """
+        path = filedialog.askopenfilename(title="Open scene",
+                                          filetypes=[("Scene files", "*" + SCENE_EXTENSION)])
+        if path:
+            try:
+                self.scene.load(path, replace=True, bounds=WORLD_BOUNDS)
+            except (OSError, ValueError) as e:
+                # the drawing is left as it was, progressive draw and animation included
+                messagebox.showwarning(title="Open Failed", message=str(e))
+            else:
+                # the shapes they were drawing are gone with the old scene
+                self.cancel_progressive_draw()
+                self.stop_animation()
+                self.clear_circles()
+
+    def target_shape(self):
+        """
+        returns the shape the Undo, Recolor, and Re-segment buttons act on:
+        the selected shape if there is one, otherwise the shape drawn last.
+        """
+        if self.selected_shape is not None and self.selected_shape in self.scene.shapes:
+            return self.selected_shape
+        return self.scene.last()
+
+    def toggle_animation(self):
+        """
+        Starts animating the selected shape, or the shape drawn last: its
+        vertices circle about their places and its segments sweep up and
+        down (and its color too, with random color checked). A second
+        click stops the animation and puts the shape back as it was.
+        """
+        if self.animation is not None:
+            self.stop_animation()
+            return
+        self.cancel_progressive_draw()
+        shape = self.target_shape()
+        if shape is None:
+            return
+        # the animation draws a copy, so the scene (and anything saved or
+        # exported meanwhile) keeps the shape as drawn
+        if isinstance(shape, Web):
+            moving = Web(shape.vertices, shape.segments, shape.color, bounds=WORLD_BOUNDS)
+        else:
+            moving = type(shape)(shape.vertices, shape.segments, shape.color)
+        count = len(shape.vertices)
+        vertices = [orbit(vertex, ANIMATION_RADIUS, ANIMATION_PERIOD / 2, i / count)
+                    for i, vertex in enumerate(shape.vertices)]
+        moving.lod = shape.lod
+        moving.envelope = shape.envelope
+        color = None
+        if self.random_on_off.get() == 1:
+            color = color_cycle([shape.color] + ['#%06X' % random.randrange(0x1000000) for i in range(2)],
+                                ANIMATION_PERIOD)
+        segments = ping_pong(max(1, shape.segments // 4), shape.segments, ANIMATION_PERIOD)
+
+        # the shape is taken out of the view while its copy moves
+        self.renderer.delete(shape.tag)
+        self.animated_shape = shape
+        self.animation = Animation(self.master, ItemRenderer(self.canvas, self.viewport), budget_ms=FRAME_MS - 4,
+                                   on_frame=self.show_animation_rate)
+        self.animation.add(moving, updater(vertices, segments, color))
+        self.animation.start()
+        self.animate_button.config(text="Stop")
+
+    def stop_animation(self):
+        """
+        Stops the animation, if there is one, and draws its shape again as it was.
+        """
+        if self.animation is None:
+            return
+        self.animation.clear()
+        if self.animated_shape in self.scene.shapes:
+            self.scene.redraw(self.animated_shape)
+        self.animation = None
+        self.animated_shape = None
+        self.animate_button.config(text="Animate")
+        self.animation_label.config(text='')
+
+    def show_animation_rate(self, animation):
+        # about twice a second is plenty for a readout
+        if animation.frames % 30 == 0:
+            self.animation_label.config(text=animation.report())
+
+    def undo_last_shape(self):
+        """
+        Removes the selected shape, or the shape drawn last, from the canvas.
+        """
+        self.cancel_progressive_draw()
+        self.stop_animation()
+        shape = self.target_shape()
+        if shape is not None:
+            self.scene.remove(shape)
+            self.selected_shape = None
+
+    def recolor_last_shape(self):
+        """
+        Gives the selected shape, or the shape drawn last, the current color
+        (a new random one if random color is checked), without recomputing
+        or redrawing it.
+        """
+        self.stop_animation()
+        shape = self.target_shape()
+        if shape is not None:
+            self.pick_random_color()
+            self.scene.recolor(shape, self.color)
+
+    def resegment_last_shape(self):
+        """
+        Redraws the selected shape, or the shape drawn last, with the number
+        of segments entered.
+        """
+        self.cancel_progressive_draw()
+        self.stop_animation()
+        shape = self.target_shape()
+        if shape is not None:
+            self.set_segments()
+            self.scene.resegment(shape, self.segment)
+
+    def select_shape(self, event):
+        """
+        Selects the topmost shape under the mouse, found through the
+        spatial index of the view.
+        """
+        tag = self.viewport.tag_at(event.x, event.y)
+        self.selected_shape = None if tag is None else self.scene.find(tag)
+        if self.selected_shape is None:
+            self.status_bar_text.set("Nothing selected")
+        else:
+            self.status_bar_text.set("Selected %s (%s)" % (self.selected_shape.tag,
+                                                            type(self.selected_shape).__name__))
+
+    def zoom_view(self, event):
+        # Button-4 and Button-5 are the wheel on X11, MouseWheel elsewhere
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            factor = ZOOM_STEP
+        else:
+            factor = 1 / ZOOM_STEP
+        self.viewport.zoom_at(event.x, event.y, factor)
+        self.schedule_view_redraw()
+
+    def start_pan(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def drag_pan(self, event):
+        if self.pan_start is not None:
+            self.viewport.pan(event.x - self.pan_start[0], event.y - self.pan_start[1])
+            self.pan_start = (event.x, event.y)
+            self.schedule_view_redraw()
+
+    def reset_view(self):
+        self.viewport.reset()
+        self.schedule_view_redraw()
+
+    def schedule_view_redraw(self):
+        """
+        Redraws the view at most once per frame, however fast the
+        zoom and pan events come.
+        """
+        if self.view_after_id is None:
+            self.view_after_id = self.master.after(FRAME_MS, self.redraw_view)
+
+    def redraw_view(self):
+        self.view_after_id = None
+        if self.viewport.zoom != self.drawn_zoom:
+            self.drawn_zoom = self.viewport.zoom
+            self.redraw_scaled_shapes()
+        self.viewport.redraw()
+        self.markers.place_all()
+        self.flush_mouse_location()
+
+    def redraw_scaled_shapes(self):
+        """
+        Draws again the shapes whose lines depend on the zoom: those with
+        level of detail on, whose number of chords follows it, and those in
+        envelope mode, whose curves are flattened for it. Shapes still being
+        drawn progressively or standing in for an animation are left alone.
+        """
+        busy = [self.animated_shape]
+        if self.progressive_draw is not None and self.progressive_draw.is_running():
+            busy.append(self.progressive_draw.shape)
+        for shape in list(self.scene.shapes):
+            if (shape.lod or shape.envelope) and shape not in busy:
+                self.scene.redraw(shape)
 
     def return_validated_and_converted_vals_(self, entries_list_):
         """
@@ -488,10 +883,14 @@ class MainApp:
         then passes the int values to the Shape constructor to
         draw the object to canvas.
         """
+        if shape_ == 'poly':
+            # the polygon text is kept, so the same polygon can be drawn again
+            vertices = self.read_poly_text()
+            if vertices is not None:
+                self.draw_shape(shape_, vertices)
+            return
         if shape_ == 'angle':
             passed_list = self.angle_vertices_entries
-        elif shape_ == 'poly':
-            passed_list = self.poly_vertices_entries
         else:
             passed_list = self.web_vertices_entries
 
@@ -510,14 +909,16 @@ class MainApp:
         if shape_ == 'angle':
             passed_list = self.angle_vertices_labels
         elif shape_ == 'poly':
-            passed_list = self.poly_vertices_labels
-            # destroy all lines of poly widgets
-            for widget in self.lines_of_poly_widgets:
-                widget.destroy()
-            # and clear the list
-            self.lines_of_poly_widgets.clear()
-            self.poly_vertices_labels.clear()
+            if len(self.temp_clicked_values) < 3:
+                messagebox.showwarning(title="Improper Polygon", message="A polygon must have at least 3 vertices.")
+                return
+            passed_list = []
+            self.poly_vertices_list.delete(0, 'end')
         else:
+            if len(self.temp_clicked_values) < 4:
+                messagebox.showwarning(title="Improper Web",
+                                       message="A web needs the two ends of both of its axes.")
+                return
             passed_list = self.web_vertices_labels
 
         self.draw_shape(shape_, self.temp_clicked_values)
@@ -536,11 +937,11 @@ class MainApp:
                 _y = int(pair[1].get())
                 if _x < 0:
                     return False
-                elif _x >= CANVAS_SIZE:
+                elif _x >= WORLD_SIZE:
                     return False
                 elif _y < 0:
                     return False
-                elif _y >= CANVAS_SIZE:
+                elif _y >= WORLD_SIZE:
                     return False
             return True
         except ValueError:
@@ -583,12 +984,24 @@ class MainApp:
             self.color = 'black'
 
     def update_statusbar(self, a, b, c):
-        newtext = self.mouse_location.get()
+        # also shows how many callbacks watch mouse_location, which should always be 1
+        newtext = self.mouse_location.get() + "    (callbacks: %d)" % len(self.mouse_location.trace_info())
         self.status_bar_text.set(newtext)
 
     def track_mouse(self, event):
-        self.mouse_location.set("Canvas coordinates: x: %d, y: %d" % (event.x, event.y))
-        self.mouse_location.trace('w', self.update_statusbar)
+        """
+        Remembers the mouse position. Motion events come much faster than
+        the screen refreshes, so they are coalesced into one status bar
+        update per frame.
+        """
+        self.mouse_xy = (event.x, event.y)
+        if self.statusbar_after_id is None:
+            self.statusbar_after_id = self.master.after(FRAME_MS, self.flush_mouse_location)
+
+    def flush_mouse_location(self):
+        self.statusbar_after_id = None
+        x, y = self.viewport.to_world(*self.mouse_xy)
+        self.mouse_location.set("Drawing coordinates: x: %d, y: %d    zoom: %.2fx" % (x, y, self.viewport.zoom))
 
     def clear_text(self, user_input):
         for pair in user_input:
@@ -600,34 +1013,58 @@ class MainApp:
             label.config(text='')
 
     def clear_canvas(self):
-        # clear the canvas
-        self.canvas.delete('all')
+        # clear the canvas: the shapes of the scene and the clicked circles
+        self.cancel_progressive_draw()
+        self.stop_animation()
+        self.scene.clear()
+        self.clear_circles()
         # clear all the Entry boxes
         self.clear_text(self.angle_vertices_entries)
-        self.clear_text(self.poly_vertices_entries)
         self.clear_text(self.web_vertices_entries)
+        if self.poly_text is not None:
+            self.poly_text.delete('1.0', 'end')
         # clear all labels
         for label in self.angle_vertices_labels:
             label.config(text='')
-        for label in self.poly_vertices_labels:
-            label.config(text='')
         for label in self.web_vertices_labels:
             label.config(text='')
         # reset the mouse clicks and list to store clicked values at 0
         self.mouse_click_counter = 0
         self.temp_clicked_values.clear()
-        # destroy the lines of widgets in poly_clicked frames to clear the window
-        for widget in self.lines_of_poly_widgets:
-            widget.destroy()
-
-
-
-
-def main():
+        # empty the list of clicked polygon vertices
+        if self.poly_vertices_list is not None:
+            self.poly_vertices_list.delete(0, 'end')
+
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draw parabolic curves.")
+    parser.add_argument('--startup-time', action='store_true',
+                        help="print the cold start time and quit once the window is up")
+    parser.add_argument('--batch', metavar='JOBS',
+                        help="render the job file JOBS without the GUI; the options of "
+                             "batch_render.py (-o OUT_DIR, -j WORKERS, --size SIZE) may follow")
+    args, batch_args = parser.parse_known_args(argv)
+    if args.batch is not None:
+        # imported here so the GUI does not load the batch renderer, and
+        # the batch path never loads tkinter
+        import batch_render
+        return batch_render.main([args.batch] + batch_args)
+    if batch_args:
+        parser.error("unrecognized arguments: %s" % ' '.join(batch_args))
+
+    load_tkinter()
     root = tk.Tk()
     ma = MainApp(root)
+    if args.startup_time:
+        def report():
+            print(ma.startup_summary())
+            root.destroy()
+        # runs after MainApp.report_startup, which was scheduled first
+        root.after_idle(report)
     root.mainloop()
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
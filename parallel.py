@@ -0,0 +1,143 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from shapes import make_shape, points_per_line
+from renderers import as_renderer
+
+"""
+This parallel.py file computes the curves of many shapes at once in worker
+processes. The workers write the chord end points straight into one
+shared-memory buffer of doubles, so nothing but the shape specs and a few
+offsets crosses the process boundary. The main process draws the shapes
+to the active renderer, in order, as each batch of shapes is finished.
+
+"""
+
+ITEM_SIZE = array('d').itemsize
+
+
+def _fill_buffer(buffer_name, batch):
+    """
+    Runs in a worker process. Computes the chord families of every shape
+    in the batch and writes them into the shared buffer, each family as
+    line1 followed by line2, starting at the offset given for the shape.
+    batch is a list of (offset, spec) pairs.
+    """
+    memory = shared_memory.SharedMemory(name=buffer_name)
+    buffer = memory.buf.cast('d')
+    try:
+        for offset, spec in batch:
+            shape = make_shape(spec['shape'], spec['vertices'], spec['segments'], spec['color'])
+            for line1, line2 in shape.chord_families():
+                buffer[offset:offset + len(line1)] = line1
+                offset += len(line1)
+                buffer[offset:offset + len(line2)] = line2
+                offset += len(line2)
+    finally:
+        buffer.release()
+        memory.close()
+    return len(batch)
+
+
+def _read_families(memory, offset, num_families, line_len):
+    """
+    Copies the chord families of one shape out of the shared buffer.
+    """
+    families = []
+    for i in range(num_families):
+        lines = []
+        for j in range(2):
+            line = array('d')
+            line.frombytes(memory.buf[offset * ITEM_SIZE:(offset + line_len) * ITEM_SIZE])
+            lines.append(line)
+            offset += line_len
+        families.append(tuple(lines))
+    return families
+
+
+def split_batches(items, weights, num_batches):
+    """
+    Splits items into at most num_batches consecutive batches of
+    roughly equal total weight.
+    """
+    total = sum(weights)
+    target = total / num_batches if num_batches else total
+    batches = []
+    batch = []
+    batch_weight = 0
+    for item, weight in zip(items, weights):
+        batch.append(item)
+        batch_weight += weight
+        if batch_weight >= target and len(batches) < num_batches - 1:
+            batches.append(batch)
+            batch = []
+            batch_weight = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def normalize_spec(spec):
+    """
+    returns a shape spec as a dict with 'shape', 'vertices', 'segments',
+    and 'color' keys. Accepts a dict or a (shape, vertices, segments, color) tuple.
+    """
+    if not isinstance(spec, dict):
+        spec = dict(zip(('shape', 'vertices', 'segments', 'color'), spec))
+    return {'shape': spec['shape'],
+            'vertices': [tuple(point) for point in spec['vertices']],
+            'segments': int(spec.get('segments', 30)),
+            'color': spec.get('color', 'black')}
+
+
+def render_parallel(specs, canvas, workers=None):
+    """
+    Draws all the shapes described by specs (dicts or tuples, see
+    normalize_spec) to the canvas or renderer given, computing their
+    curves in a pool of worker processes (None uses every core).
+    Returns the list of shapes drawn, with None in place of a web
+    whose axes do not intersect on the canvas.
+    """
+    renderer = as_renderer(canvas)
+    specs = [normalize_spec(spec) for spec in specs]
+    shapes_ = []
+    for spec in specs:
+        shape = make_shape(spec['shape'], spec['vertices'], spec['segments'], spec['color'])
+        if spec['shape'] == 'web' and shape.get_point_of_int() is None:
+            shape = None
+        shapes_.append(shape)
+
+    # lay the chord families of the shapes out one after the other in the buffer
+    jobs = []
+    offset = 0
+    for index, shape in enumerate(shapes_):
+        if shape is not None:
+            jobs.append((index, offset))
+            offset += 4 * shape.chord_count()
+    if offset == 0:
+        for shape in shapes_:
+            if shape is not None:
+                shape.draw_outline(renderer)
+        return shapes_
+
+    workers = workers or os.cpu_count() or 1
+    batches = split_batches(jobs, [shape.chord_count() + 1 for shape in shapes_ if shape is not None],
+                            4 * workers)
+    memory = shared_memory.SharedMemory(create=True, size=offset * ITEM_SIZE)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            work = [[(offset_, specs[index]) for index, offset_ in batch] for batch in batches]
+            done = pool.map(_fill_buffer, [memory.name] * len(work), work)
+            # stream each batch to the renderer as soon as it is in the buffer
+            for batch, _ in zip(batches, done):
+                for index, offset_ in batch:
+                    shape = shapes_[index]
+                    families = _read_families(memory, offset_, len(shape.corners()),
+                                              2 * points_per_line(shape.segments))
+                    shape.draw_outline(renderer)
+                    shape.draw_families(renderer, families)
+    finally:
+        memory.close()
+        memory.unlink()
+    return shapes_
@@ -0,0 +1,91 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+"""
+the profiling.py file contains the DrawProfiler class, which times the
+phases of drawing a shape (geometry, emission to the renderer, and the Tk
+idle flush) and keeps the item counts of each draw. It can be switched on
+and off at any time and exports its records as a trace file that can be
+opened in chrome://tracing or Perfetto.
+
+"""
+
+
+class DrawProfiler:
+    """
+    Records one entry per draw: the shape, its segments, the time spent
+    in each phase, and the number of items and chords drawn.
+    Keeps the last max_records draws. Does nothing while not enabled.
+    """
+
+    def __init__(self, max_records=1000):
+        self.enabled = False
+        self.records = deque(maxlen=max_records)
+        self.current = None
+        self.origin = time.perf_counter()
+
+    def start(self, shape_, segments):
+        """
+        Begins the record of a new draw.
+        """
+        if not self.enabled:
+            return
+        self.current = {'shape': shape_, 'segments': segments,
+                        'start': time.perf_counter() - self.origin, 'phases': []}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the code in the with block as the phase name of the current draw.
+        """
+        if self.current is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current['phases'].append((name, start - self.origin, time.perf_counter() - start))
+
+    def finish(self, **counts):
+        """
+        Ends the current draw, adding the counts given (items, chords, ...)
+        to its record. Returns the record, or None when not enabled.
+        """
+        record = self.current
+        if record is None:
+            return None
+        self.current = None
+        record['counts'] = counts
+        record['total'] = sum(duration for name, start, duration in record['phases'])
+        self.records.append(record)
+        return record
+
+    @staticmethod
+    def summary(record):
+        """
+        returns a one line readout of a record for the status bar.
+        """
+        phases = ', '.join('%s %.1f ms' % (name, duration * 1000) for name, start, duration in record['phases'])
+        counts = ', '.join('%d %s' % (value, name) for name, value in record['counts'].items())
+        return "%s (%d segments): %s | %s" % (record['shape'], record['segments'], phases, counts)
+
+    def export(self, path):
+        """
+        Writes all the records to path in the Chrome trace event format.
+        """
+        events = []
+        for record in self.records:
+            events.append({'name': 'draw_shape %s' % record['shape'], 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': record['start'] * 1e6, 'dur': record['total'] * 1e6,
+                           'args': dict(record['counts'], segments=record['segments'])})
+            for name, start, duration in record['phases']:
+                events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': start * 1e6, 'dur': duration * 1e6})
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    def clear(self):
+        self.records.clear()
@@ -0,0 +1,98 @@
+import time
+from array import array
+from itertools import islice
+
+"""
+the progressive.py file contains the ProgressiveDraw class, which draws a
+shape a few chords at a time from the Tk event loop, so that the window
+stays responsive while a shape with many segments is drawn.
+
+"""
+
+
+class ProgressiveDraw:
+    """
+    Draws the outline of a shape right away, then computes and emits its
+    chords in chunks, pulling them lazily from shape.iter_families(), so no
+    step computes more geometry than it draws, however large the shape.
+    Each step emits chunks until its time budget is spent and
+    schedules the next step with after(), letting Tk handle input and
+    redraw in between. The draw can be cancelled at any time.
+    The chunks after the first of each curve go out with continue_chords,
+    so a renderer that keeps each chord family as one item, such as the
+    Viewport, still holds each curve as one family.
+    """
+
+    def __init__(self, widget, renderer, shape, scale=None, budget_ms=10, chunk=200,
+                 on_progress=None, on_done=None):
+        """
+        widget: any tkinter widget, used to schedule the steps
+        scale: the scale level of detail is worked out for, as for iter_families()
+        budget_ms: time a step may take, kept below one frame
+        chunk: number of chords sent to the renderer at a time
+        on_progress(done, total): called after every step
+        on_done(): called once the last chord is drawn
+        """
+        self.widget = widget
+        self.renderer = renderer
+        self.shape = shape
+        self.families = shape.iter_families(scale)
+        self.chords = next(self.families, None)  # the chords of the curve being drawn
+        self.sides = iter(shape.outlined_sides())
+        self.outlined = next(self.sides, None)  # which sides of that curve the outline draws
+        self.continued = False  # whether chords of that curve were drawn already
+        self.budget = budget_ms / 1000
+        self.chunk = chunk
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.total = shape.chord_count(scale)
+        self.done = 0
+        self.after_id = None
+        self.finished = False
+        self.cancelled = False
+
+    def start(self):
+        self.shape.draw_outline(self.renderer)
+        self.after_id = self.widget.after_idle(self.step)
+        return self
+
+    def step(self):
+        """
+        Emits chunks of chords until the time budget of the step is spent.
+        """
+        self.after_id = None
+        deadline = time.perf_counter() + self.budget
+        while self.chords is not None and time.perf_counter() < deadline:
+            chunk = list(islice(self.chords, self.chunk))
+            if chunk:
+                line1 = array('d', [value for chord in chunk for value in chord[0:2]])
+                line2 = array('d', [value for chord in chunk for value in chord[2:4]])
+                # the chunks of a curve stay one chord family
+                self.shape.draw_chords(line1, line2, self.renderer, self.outlined, self.continued)
+                self.continued = True
+                self.done += len(chunk)
+            if len(chunk) < self.chunk:
+                self.chords = next(self.families, None)
+                self.outlined = next(self.sides, None)
+                self.continued = False
+        if self.on_progress is not None:
+            self.on_progress(self.done, self.total)
+        if self.chords is not None:
+            self.after_id = self.widget.after(1, self.step)
+        else:
+            self.finished = True
+            if self.on_done is not None:
+                self.on_done()
+
+    def cancel(self):
+        """
+        Stops the draw; the chords drawn so far stay on the canvas.
+        """
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+        if not self.finished:
+            self.cancelled = True
+
+    def is_running(self):
+        return not (self.finished or self.cancelled)
@@ -0,0 +1,243 @@
+import math
+import os
+import struct
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from renderers import SegmentListRenderer, color_to_rgb
+
+"""
+the raster.py file exports shapes as PNG images of any size with a small
+pure-Python rasterizer. The shapes are drawn into an in-memory segment
+list scaled to the image size and kept as flat arrays of doubles, then
+rasterized one tile at a time into bytearray buffers. Each tile is given
+only the polylines and chord families whose bounding box meets it, so
+neither the pixels nor the geometry a tile works on grow with the image.
+The image is written either as one stitched PNG, streamed a band of tiles
+at a time, or as one PNG file per tile. Tiles can be spread across cores.
+
+"""
+
+BACKGROUND = (255, 255, 255)
+
+
+def collect_segments(shapes_, scale):
+    """
+    Draws the shapes into a SegmentListRenderer at the scale given (pixels
+    per unit of the drawing), so that level of detail, if on, keeps the
+    chords that are visible at that size. Returns a list of
+    (bbox, kind, coords, line2, rgb) tuples in drawing order, with the
+    coordinates already scaled to pixels in array('d') form.
+    """
+    records = []
+    for shape in shapes_:
+        # one shape at a time, so only its unscaled geometry is held at once
+        renderer = SegmentListRenderer()
+        renderer.scale = scale
+        shape.fill(renderer)
+        for kind, coords, line2, color, tag in renderer.records:
+            if len(coords) == 0:
+                continue
+            coords = array('d', [value * scale for value in coords])
+            xs = coords[0::2]
+            ys = coords[1::2]
+            bbox = [min(xs), min(ys), max(xs), max(ys)]
+            if line2 is not None:
+                line2 = array('d', [value * scale for value in line2])
+                xs = line2[0::2]
+                ys = line2[1::2]
+                bbox = [min(bbox[0], min(xs)), min(bbox[1], min(ys)), max(bbox[2], max(xs)), max(bbox[3], max(ys))]
+            records.append((tuple(bbox), kind, coords, line2, color_to_rgb(color)))
+    return records
+
+
+def tile_records(records, left, top, width, height):
+    """
+    returns the records whose bounding box meets the tile given.
+    """
+    right = left + width
+    bottom = top + height
+    return [record for record in records
+            if not (record[0][2] < left or record[0][0] >= right or record[0][3] < top or record[0][1] >= bottom)]
+
+
+def clip_segment(x1, y1, x2, y2, left, top, right, bottom):
+    """
+    Clips a segment to the rectangle given (Liang-Barsky).
+    returns the clipped end points, or None if nothing is inside.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    t0 = 0.0
+    t1 = 1.0
+    for p, q in ((-dx, x1 - left), (dx, right - x1), (-dy, y1 - top), (dy, bottom - y1)):
+        if p == 0:
+            if q < 0:
+                return None
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1:
+                    return None
+                t0 = max(t0, t)
+            else:
+                if t < t0:
+                    return None
+                t1 = min(t1, t)
+    return x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy
+
+
+def draw_segment(pixels, width, height, x1, y1, x2, y2, rgb):
+    """
+    Draws a one pixel wide line into an RGB bytearray of width x height
+    pixels, stepping one pixel at a time along the longer axis.
+    The coordinates are relative to the buffer and already clipped.
+    """
+    steps = int(max(abs(x2 - x1), abs(y2 - y1)))
+    color = bytes(rgb)
+    if steps == 0:
+        x = int(x1)
+        y = int(y1)
+        if 0 <= x < width and 0 <= y < height:
+            index = 3 * (y * width + x)
+            pixels[index:index + 3] = color
+        return
+    step_x = (x2 - x1) / steps
+    step_y = (y2 - y1) / steps
+    for i in range(steps + 1):
+        x = int(x1 + i * step_x)
+        y = int(y1 + i * step_y)
+        if 0 <= x < width and 0 <= y < height:
+            index = 3 * (y * width + x)
+            pixels[index:index + 3] = color
+
+
+def rasterize_tile(records, left, top, width, height):
+    """
+    returns an RGB bytearray of the width x height pixels whose top left
+    corner is at (left, top) in the full image.
+    """
+    pixels = bytearray(bytes(BACKGROUND) * (width * height))
+    right = left + width
+    bottom = top + height
+    for bbox, kind, coords, line2, rgb in records:
+        if bbox[2] < left or bbox[0] >= right or bbox[3] < top or bbox[1] >= bottom:
+            continue  # the whole polyline or chord family is outside the tile
+        if kind == 'line':
+            segments = ((coords[i], coords[i + 1], coords[i + 2], coords[i + 3])
+                        for i in range(0, len(coords) - 2, 2))
+        else:
+            segments = ((coords[i], coords[i + 1], line2[i], line2[i + 1]) for i in range(0, len(coords), 2))
+        for x1, y1, x2, y2 in segments:
+            clipped = clip_segment(x1, y1, x2, y2, left, top, right - 1e-9, bottom - 1e-9)
+            if clipped is not None:
+                draw_segment(pixels, width, height, clipped[0] - left, clipped[1] - top,
+                             clipped[2] - left, clipped[3] - top, rgb)
+    return pixels
+
+
+class PNGWriter:
+    """
+    Writes an 8-bit RGB PNG file row band by row band, compressing as it
+    goes, so the whole image never has to be in memory.
+    """
+
+    def __init__(self, path, width, height):
+        self.file = open(path, 'wb')
+        self.width = width
+        self.height = height
+        self.compressor = zlib.compressobj(6)
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def write_chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def write_rows(self, pixels):
+        """
+        Adds rows to the image; pixels is an RGB bytearray of whole rows.
+        """
+        row_len = 3 * self.width
+        data = bytearray()
+        for start in range(0, len(pixels), row_len):
+            data.append(0)  # no filter on this row
+            data += pixels[start:start + row_len]
+        compressed = self.compressor.compress(bytes(data))
+        if compressed:
+            self.write_chunk(b'IDAT', compressed)
+
+    def close(self):
+        self.write_chunk(b'IDAT', self.compressor.flush())
+        self.write_chunk(b'IEND', b'')
+        self.file.close()
+
+
+def write_png(path, width, height, pixels):
+    writer = PNGWriter(path, width, height)
+    writer.write_rows(pixels)
+    writer.close()
+
+
+def _rasterize_in_worker(job):
+    records, tile = job
+    return rasterize_tile(records, *tile)
+
+
+def export_png(shapes_, path, size, drawing_size=500, tile_size=512, tiled=False, workers=1):
+    """
+    Exports the shapes as a size x size pixel PNG, where drawing_size units
+    of the drawing span the image (the canvas is 500 units wide).
+    With tiled=True, writes one PNG per tile next to path, named
+    <name>_<row>_<column>.png, and returns their paths; otherwise writes
+    one PNG built a band of tiles at a time and returns [path].
+    workers > 1 rasterizes the tiles in that many processes; each tile is
+    sent only the geometry that meets it, a band of tiles at a time.
+    """
+    scale = size / drawing_size
+    records = collect_segments(shapes_, scale)
+    num_tiles = math.ceil(size / tile_size)
+    bands = []
+    for row in range(num_tiles):
+        top = row * tile_size
+        height = min(tile_size, size - top)
+        bands.append([(column * tile_size, top, min(tile_size, size - column * tile_size), height)
+                      for column in range(num_tiles)])
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        rasterize = lambda tiles: pool.map(_rasterize_in_worker,
+                                           [(tile_records(records, *tile), tile) for tile in tiles])
+    else:
+        pool = None
+        rasterize = lambda tiles: (rasterize_tile(tile_records(records, *tile), *tile) for tile in tiles)
+
+    written = []
+    try:
+        if tiled:
+            base = os.path.splitext(path)[0]
+            for row, band in enumerate(bands):
+                for column, (tile, pixels) in enumerate(zip(band, rasterize(band))):
+                    tile_path = '%s_%d_%d.png' % (base, row, column)
+                    write_png(tile_path, tile[2], tile[3], pixels)
+                    written.append(tile_path)
+        else:
+            writer = PNGWriter(path, size, size)
+            for band in bands:
+                band_height = band[0][3]
+                band_pixels = bytearray(3 * size * band_height)
+                # copy each tile's rows into place in the band
+                for tile, pixels in zip(band, rasterize(band)):
+                    row_len = 3 * tile[2]
+                    for y in range(band_height):
+                        start = 3 * (y * size + tile[0])
+                        band_pixels[start:start + row_len] = pixels[y * row_len:(y + 1) * row_len]
+                writer.write_rows(band_pixels)
+            writer.close()
+            written.append(path)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return written
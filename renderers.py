@@ -0,0 +1,566 @@
+import math
+import os
+from array import array
+from colors import COLOR_NAMES
+
+"""
+the renderers.py file contains the render backends that the Angle, Polygon,
+and Web shapes draw to. A shape emits its outline as polylines and its
+curves as chord families; the backend decides where those lines end up:
+a tkinter canvas, an in-memory list, or an SVG or PostScript file.
+None of the backends import tkinter.
+
+"""
+
+
+def color_to_rgb(color):
+    """
+    converts a tkinter color ('#rgb', '#rrggbb', '#rrrgggbbb', '#rrrrggggbbbb' or one of
+    the X11 color names in COLOR_NAMES) into a tuple of three ints from 0
+    to 255. Raises ValueError for a color tkinter would not accept either.
+    """
+    if color.startswith('#') and len(color) in (4, 7, 10, 13):
+        digits = (len(color) - 1) // 3
+        try:
+            values = [int(color[1 + i * digits:1 + (i + 1) * digits], 16) for i in range(3)]
+        except ValueError:
+            raise ValueError('unknown color: %r' % (color,)) from None
+        top = 16 ** digits - 1
+        return tuple(round(v * 255 / top) for v in values)
+    rgb = COLOR_NAMES.get(color.lower().replace(' ', ''))
+    if rgb is None:
+        raise ValueError('unknown color: %r' % (color,))
+    return rgb
+
+
+def as_float_array(values):
+    """
+    returns values as an array of doubles: values itself if it already is
+    one, otherwise a copy. A memoryview of doubles (for example into a
+    memory-mapped scene file) is copied in one go rather than item by item.
+    """
+    if isinstance(values, array) and values.typecode == 'd':
+        return values
+    if isinstance(values, memoryview) and values.format == 'd' and values.contiguous:
+        copy = array('d')
+        copy.frombytes(values.cast('B'))
+        return copy
+    return array('d', values)
+
+
+def chord_path(line1, line2, outlined=(True, True)):
+    """
+    Takes two flat arrays holding the same number of points and returns the
+    coordinates of one polyline that draws every chord line1[i] -> line2[i].
+    Every other chord is walked backwards (a0 b0 b1 a1 a2 b2 ...), so the
+    steps joining two chords run along line1 or line2 themselves, which are
+    the sides of the shape and are drawn by its outline anyway.
+
+    outlined says which of line1 and line2 the outline really draws. With
+    only one of them, every chord after the first is walked there and back
+    (a0 b0 b1 a1 b1 b2 a2 b2 ...), so that all the steps run along that
+    one. returns None when neither is drawn.
+    """
+    if not all(outlined):
+        if not any(outlined):
+            return None
+        rail, other = (as_float_array(line2), as_float_array(line1)) if outlined[1] else \
+            (as_float_array(line1), as_float_array(line2))
+        path = array('d', [0.0]) * (3 * len(rail))
+        path[0::6] = rail[0::2]
+        path[1::6] = rail[1::2]
+        path[2::6] = other[0::2]
+        path[3::6] = other[1::2]
+        path[4::6] = rail[0::2]
+        path[5::6] = rail[1::2]
+        # the path starts at the far end of the first chord
+        return path[2:]
+    line1 = as_float_array(line1)
+    starts = array('d', line1)
+    ends = array('d', as_float_array(line2))
+    # swap the ends of every odd chord
+    starts[2::4] = ends[2::4]
+    starts[3::4] = ends[3::4]
+    ends[2::4] = line1[2::4]
+    ends[3::4] = line1[3::4]
+    path = array('d', [0.0]) * (2 * len(starts))
+    path[0::4] = starts[0::2]
+    path[1::4] = starts[1::2]
+    path[2::4] = ends[0::2]
+    path[3::4] = ends[1::2]
+    return path
+
+
+def bezier_steps(point0, point1, point2, tolerance):
+    """
+    returns the number of straight steps a quadratic Bezier curve needs
+    so that it strays from the true curve by at most tolerance. The curve
+    bends by B'' = 2 (p0 - 2 p1 + p2), and n even steps miss it by at most
+    |B''| / (8 n^2), so n = sqrt(|p0 - 2 p1 + p2| / (4 tolerance)).
+    """
+    bend = math.hypot(point0[0] - 2 * point1[0] + point2[0], point0[1] - 2 * point1[1] + point2[1])
+    return max(1, math.ceil(math.sqrt(bend / (4 * tolerance))))
+
+
+def bezier_points(point0, point1, point2, steps):
+    """
+    returns the flat list of x, y pairs of the points at steps + 1 even
+    values of t along the quadratic Bezier curve with control points
+    point0, point1, point2, ends included.
+    """
+    coords = []
+    for k in range(steps + 1):
+        t = k / steps
+        a = (1 - t) * (1 - t)
+        b = 2 * t * (1 - t)
+        c = t * t
+        coords.append(a * point0[0] + b * point1[0] + c * point2[0])
+        coords.append(a * point0[1] + b * point1[1] + c * point2[1])
+    return coords
+
+
+def cubic_controls(point0, point1, point2):
+    """
+    returns the two inner control points of the cubic Bezier curve that
+    is the same curve as the quadratic one with control points point0,
+    point1, point2, for outputs that only have cubic curves.
+    """
+    return ((point0[0] + 2 * (point1[0] - point0[0]) / 3, point0[1] + 2 * (point1[1] - point0[1]) / 3),
+            (point2[0] + 2 * (point1[0] - point2[0]) / 3, point2[1] + 2 * (point1[1] - point2[1]) / 3))
+
+
+class Renderer:
+    """
+    Base class of the render backends. Subclasses must implement draw_line
+    and may override draw_chords to send a whole chord family at once.
+    The draw methods return the id of the item they create, or None when
+    the backend has no item ids.
+    """
+    # pixels per unit of the drawing, used by shapes drawn with level of
+    # detail; None means the output has no fixed resolution (vector files)
+    scale = 1.0
+    # True for backends that join a chord family into one polyline with
+    # chord_path, whose steps run along the sides of the family
+    joins_chords = False
+
+    def draw_line(self, coords, color, tag):
+        """
+        Draws the polyline through the flat list of x, y pairs given.
+        """
+        raise NotImplementedError
+
+    def draw_chords(self, line1, line2, color, tag):
+        """
+        Draws a line from every point of line1 to the point of line2
+        at the same index. line1 and line2 are flat arrays of x, y pairs.
+        """
+        for i in range(0, len(line1), 2):
+            self.draw_line([line1[i], line1[i + 1], line2[i], line2[i + 1]], color, tag)
+
+    def continue_chords(self, line1, line2, color, tag):
+        """
+        Draws more chords of the chord family drawn last with the tag, for
+        a family sent in parts, such as a progressive draw. This base
+        version draws them as a family of their own; backends that keep
+        each family as one item override it to add them to that family.
+        """
+        return self.draw_chords(line1, line2, color, tag)
+
+    def draw_chord_stream(self, chords, color, tag, chunk=4096):
+        """
+        Draws a chord family given as an iterable of (x1, y1, x2, y2)
+        tuples, chunk chords at a time, so that only one chunk is ever in
+        memory. Returns the id of the last item created, if any.
+        """
+        item = None
+        line1 = array('d')
+        line2 = array('d')
+        for x1, y1, x2, y2 in chords:
+            line1.append(x1)
+            line1.append(y1)
+            line2.append(x2)
+            line2.append(y2)
+            if len(line1) >= 2 * chunk:
+                item = self.draw_chords(line1, line2, color, tag)
+                line1 = array('d')
+                line2 = array('d')
+        if len(line1):
+            item = self.draw_chords(line1, line2, color, tag)
+        return item
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        """
+        Draws the quadratic Bezier curve with control points point0, point1,
+        point2. This base version draws it as a polyline that strays from
+        the curve by at most tolerance pixels at the scale of the renderer;
+        backends with native curves override it.
+        """
+        if self.scale is not None:
+            tolerance /= self.scale
+        steps = bezier_steps(point0, point1, point2, tolerance)
+        return self.draw_line(bezier_points(point0, point1, point2, steps), color, tag)
+
+    def delete(self, tag):
+        """
+        Removes everything drawn with the tag given.
+        """
+
+    def recolor(self, tag, color):
+        """
+        Changes the color of everything drawn with the tag given.
+        """
+
+    def lower(self, tag, below_tag):
+        """
+        Moves everything drawn with tag below everything drawn with below_tag.
+        """
+
+    def close(self):
+        """
+        Finishes the output. Called once the last shape is drawn.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TkRenderer(Renderer):
+    """
+    Draws to a tkinter canvas. Each chord family becomes one line item.
+    """
+    joins_chords = True
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+    def draw_line(self, coords, color, tag):
+        # tkinter takes a list of numbers; an array or memoryview converts in one call
+        coords = coords.tolist() if isinstance(coords, (array, memoryview)) else list(coords)
+        return self.canvas.create_line(coords, fill=color, tags=tag)
+
+    def draw_chords(self, line1, line2, color, tag):
+        if len(line1) == 0:
+            return None
+        return self.canvas.create_line(chord_path(line1, line2).tolist(), fill=color, tags=tag)
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        # a smoothed three point line is exactly this curve in Tk; splinesteps
+        # sets how finely Tk flattens it
+        steps = bezier_steps(point0, point1, point2, tolerance / self.scale)
+        return self.canvas.create_line(point0[0], point0[1], point1[0], point1[1], point2[0], point2[1],
+                                       smooth=True, splinesteps=steps, fill=color, tags=tag)
+
+    def delete(self, tag):
+        self.canvas.delete(tag)
+
+    def recolor(self, tag, color):
+        self.canvas.itemconfigure(tag, fill=color)
+
+    def lower(self, tag, below_tag):
+        self.canvas.tag_lower(tag, below_tag)
+
+
+class SegmentListRenderer(Renderer):
+    """
+    Keeps everything drawn in memory. The polylines and chord families are
+    stored as they arrive in self.records; segments() expands them into
+    single line segments.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def draw_line(self, coords, color, tag):
+        # a vertex_view() is kept as it is: shapes replace their coordinate
+        # arrays rather than change them, so the view still shows what was drawn
+        if not isinstance(coords, memoryview):
+            coords = array('d', coords)
+        self.records.append(('line', coords, None, color, tag))
+
+    def draw_chords(self, line1, line2, color, tag):
+        self.records.append(('chords', line1, line2, color, tag))
+
+    def delete(self, tag):
+        self.records = [record for record in self.records if record[4] != tag]
+
+    def recolor(self, tag, color):
+        self.records = [record[:3] + (color, tag) if record[4] == tag else record
+                        for record in self.records]
+
+    def lower(self, tag, below_tag):
+        moved = [record for record in self.records if record[4] == tag]
+        others = [record for record in self.records if record[4] != tag]
+        for index, record in enumerate(others):
+            if record[4] == below_tag:
+                self.records = others[:index] + moved + others[index:]
+                return
+
+    def segments(self):
+        """
+        yields a (x1, y1, x2, y2, color, tag) tuple for each line segment drawn.
+        """
+        for kind, coords, line2, color, tag in self.records:
+            if kind == 'line':
+                for i in range(0, len(coords) - 2, 2):
+                    yield coords[i], coords[i + 1], coords[i + 2], coords[i + 3], color, tag
+            else:
+                for i in range(0, len(coords), 2):
+                    yield coords[i], coords[i + 1], line2[i], line2[i + 1], color, tag
+
+    def segment_count(self):
+        """
+        returns the number of line segments drawn.
+        """
+        count = 0
+        for kind, coords, line2, color, tag in self.records:
+            if kind == 'line':
+                count += max(len(coords) // 2 - 1, 0)
+            else:
+                count += len(coords) // 2
+        return count
+
+
+class FileRenderer(Renderer):
+    """
+    Base class of the writers that stream the drawing into a file as the
+    shapes are drawn. Takes an open text file or a file name; a file opened
+    here is closed by close().
+    """
+
+    # vector output can be zoomed into, so it is always drawn at full detail
+    scale = None
+    # newline translation for files opened here; None is the platform default
+    newline = None
+
+    def __init__(self, file, width=500, height=500):
+        if isinstance(file, str):
+            self.file = open(file, 'w', newline=self.newline)
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+        self.width = width
+        self.height = height
+        self.closed = False
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.write_footer()
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class SVGRenderer(FileRenderer):
+    """
+    Writes an SVG document. Each chord family is written as one path element.
+    """
+
+    def write_header(self):
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" '
+                        'viewBox="0 0 %d %d">\n' % (self.width, self.height, self.width, self.height))
+        self.file.write('<rect width="100%" height="100%" fill="white"/>\n')
+
+    def write_footer(self):
+        self.file.write('</svg>\n')
+
+    def stroke(self, color):
+        # written as #rrggbb: SVG takes the CSS color names, some of which
+        # ('green', 'gray', ...) are not the X11 colors tkinter shows
+        return '#%02x%02x%02x' % color_to_rgb(color)
+
+    def draw_line(self, coords, color, tag):
+        points = ' '.join('%.2f,%.2f' % (coords[i], coords[i + 1]) for i in range(0, len(coords), 2))
+        self.file.write('<polyline class="%s" points="%s" fill="none" stroke="%s"/>\n'
+                        % (tag, points, self.stroke(color)))
+
+    def draw_chords(self, line1, line2, color, tag):
+        if len(line1) == 0:
+            return
+        self.file.write('<path class="%s" fill="none" stroke="%s" d="' % (tag, self.stroke(color)))
+        for i in range(0, len(line1), 2):
+            self.file.write('M%.2f %.2fL%.2f %.2f' % (line1[i], line1[i + 1], line2[i], line2[i + 1]))
+        self.file.write('"/>\n')
+
+    def draw_chord_stream(self, chords, color, tag, chunk=4096):
+        # the whole family still goes into one path element, written as the chords arrive
+        self.file.write('<path class="%s" fill="none" stroke="%s" d="' % (tag, self.stroke(color)))
+        for chord in chords:
+            self.file.write('M%.2f %.2fL%.2f %.2f' % chord)
+        self.file.write('"/>\n')
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        self.file.write('<path class="%s" fill="none" stroke="%s" d="M%.2f %.2fQ%.2f %.2f %.2f %.2f"/>\n'
+                        % (tag, self.stroke(color), point0[0], point0[1], point1[0], point1[1], point2[0], point2[1]))
+
+
+class PostScriptRenderer(FileRenderer):
+    """
+    Writes an Encapsulated PostScript document, with the y axis flipped so
+    that the canvas coordinates can be written unchanged.
+    """
+
+    def write_header(self):
+        self.file.write('%%!PS-Adobe-3.0 EPSF-3.0\n'
+                        '%%%%BoundingBox: 0 0 %d %d\n'
+                        '%%%%EndComments\n'
+                        '0 %d translate 1 -1 scale\n'
+                        '1 setlinewidth\n' % (self.width, self.height, self.height))
+
+    def write_footer(self):
+        self.file.write('showpage\n%%EOF\n')
+
+    def set_color(self, color):
+        red, green, blue = color_to_rgb(color)
+        self.file.write('%.3f %.3f %.3f setrgbcolor\n' % (red / 255, green / 255, blue / 255))
+
+    def draw_line(self, coords, color, tag):
+        self.set_color(color)
+        self.file.write('newpath %.2f %.2f moveto\n' % (coords[0], coords[1]))
+        for i in range(2, len(coords), 2):
+            self.file.write('%.2f %.2f lineto\n' % (coords[i], coords[i + 1]))
+        self.file.write('stroke\n')
+
+    def draw_chords(self, line1, line2, color, tag):
+        if len(line1) == 0:
+            return
+        self.set_color(color)
+        self.file.write('newpath\n')
+        for i in range(0, len(line1), 2):
+            self.file.write('%.2f %.2f moveto %.2f %.2f lineto\n' % (line1[i], line1[i + 1], line2[i], line2[i + 1]))
+        self.file.write('stroke\n')
+
+    def draw_chord_stream(self, chords, color, tag, chunk=4096):
+        self.set_color(color)
+        self.file.write('newpath\n')
+        for chord in chords:
+            self.file.write('%.2f %.2f moveto %.2f %.2f lineto\n' % chord)
+        self.file.write('stroke\n')
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        control1, control2 = cubic_controls(point0, point1, point2)
+        self.set_color(color)
+        self.file.write('newpath %.2f %.2f moveto %.2f %.2f %.2f %.2f %.2f %.2f curveto stroke\n'
+                        % (point0[0], point0[1], control1[0], control1[1], control2[0], control2[1],
+                           point2[0], point2[1]))
+
+
+class PDFRenderer(FileRenderer):
+    """
+    Writes a one page PDF document. The page content is streamed to the
+    file as the shapes are drawn; its length and the cross-reference table
+    are written at the end, so the document never has to be held in memory.
+    Each chord family is stroked as one path. Only ASCII is written, so the
+    byte offsets the PDF needs are counted as characters.
+    """
+    newline = ''
+
+    def write(self, text):
+        self.position += len(text)
+        self.file.write(text)
+
+    def start_object(self, number):
+        self.offsets[number] = self.position
+        self.write('%d 0 obj\n' % number)
+
+    def write_header(self):
+        self.position = 0
+        self.offsets = {}
+        self.write('%PDF-1.4\n')
+        self.start_object(1)
+        self.write('<< /Type /Catalog /Pages 2 0 R >>\nendobj\n')
+        self.start_object(2)
+        self.write('<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n')
+        self.start_object(3)
+        self.write('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents 4 0 R >>\nendobj\n'
+                   % (self.width, self.height))
+        # the length of the content is not known yet, so it is an indirect object written last
+        self.start_object(4)
+        self.write('<< /Length 5 0 R >>\nstream\n')
+        self.content_start = self.position
+        # flip the y axis so that the canvas coordinates can be written unchanged
+        self.write('1 0 0 -1 0 %d cm 1 w 1 J 1 j\n' % self.height)
+
+    def write_footer(self):
+        # every content line ends in a newline; the last one is the end of line
+        # marker before endstream, which the length leaves out
+        length = self.position - self.content_start - 1
+        self.write('endstream\nendobj\n')
+        self.start_object(5)
+        self.write('%d\nendobj\n' % length)
+        xref = self.position
+        self.write('xref\n0 6\n0000000000 65535 f \n')
+        for number in range(1, 6):
+            self.write('%010d 00000 n \n' % self.offsets[number])
+        self.write('trailer\n<< /Size 6 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % xref)
+
+    def set_color(self, color):
+        red, green, blue = color_to_rgb(color)
+        self.write('%.3f %.3f %.3f RG\n' % (red / 255, green / 255, blue / 255))
+
+    def draw_line(self, coords, color, tag):
+        self.set_color(color)
+        self.write('%.2f %.2f m\n' % (coords[0], coords[1]))
+        for i in range(2, len(coords), 2):
+            self.write('%.2f %.2f l\n' % (coords[i], coords[i + 1]))
+        self.write('S\n')
+
+    def draw_chords(self, line1, line2, color, tag):
+        if len(line1) == 0:
+            return
+        self.set_color(color)
+        for i in range(0, len(line1), 2):
+            self.write('%.2f %.2f m %.2f %.2f l\n' % (line1[i], line1[i + 1], line2[i], line2[i + 1]))
+        self.write('S\n')
+
+    def draw_chord_stream(self, chords, color, tag, chunk=4096):
+        self.set_color(color)
+        for chord in chords:
+            self.write('%.2f %.2f m %.2f %.2f l\n' % chord)
+        self.write('S\n')
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        control1, control2 = cubic_controls(point0, point1, point2)
+        self.set_color(color)
+        self.write('%.2f %.2f m %.2f %.2f %.2f %.2f %.2f %.2f c S\n'
+                   % (point0[0], point0[1], control1[0], control1[1], control2[0], control2[1],
+                      point2[0], point2[1]))
+
+
+# the file writers by file extension
+WRITERS = {'.svg': SVGRenderer, '.pdf': PDFRenderer, '.eps': PostScriptRenderer, '.ps': PostScriptRenderer}
+
+
+def open_writer(path, width=500, height=500):
+    """
+    returns the file writer for path, chosen by its extension.
+    Raises ValueError for an extension with no writer.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError('cannot write %r, use one of %s' % (path, ', '.join(sorted(WRITERS))))
+    return WRITERS[extension](path, width, height)
+
+
+def as_renderer(target):
+    """
+    returns target if it is already a Renderer, otherwise
+    treats it as a tkinter canvas and wraps it in a TkRenderer.
+    """
+    if isinstance(target, Renderer):
+        return target
+    return TkRenderer(target)
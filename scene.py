@@ -0,0 +1,148 @@
+from renderers import as_renderer, open_writer
+from raster import export_png
+from scene_file import save_scene, load_scene
+
+"""
+the scene.py file contains the Scene class, which keeps every Angle,
+Polygon, and Web drawn to a canvas so that a single shape can later be
+removed, recolored, or redrawn with a different number of segments,
+touching only the canvas items of that shape.
+
+"""
+
+
+class Scene:
+    """
+    The shapes drawn to one canvas or renderer, in drawing order.
+    Each shape knows its own canvas tag and item ids.
+    """
+
+    def __init__(self, canvas):
+        self.renderer = as_renderer(canvas)
+        self.shapes = []
+
+    def add(self, shape, families=None):
+        """
+        Draws the shape and records it. Returns the shape.
+        The chord families of the shape may be passed in if they
+        have already been computed.
+        """
+        if families is None:
+            shape.fill(self.renderer)
+        else:
+            shape.draw_outline(self.renderer)
+            shape.draw_families(self.renderer, families)
+        self.shapes.append(shape)
+        return shape
+
+    def track(self, shape):
+        """
+        Records a shape that is being drawn some other way,
+        for example progressively. Returns the shape.
+        """
+        self.shapes.append(shape)
+        return shape
+
+    def remove(self, shape):
+        """
+        Deletes the items of the shape and forgets it.
+        """
+        shape.delete(self.renderer)
+        self.shapes.remove(shape)
+
+    def recolor(self, shape, color):
+        shape.recolor(self.renderer, color)
+
+    def resegment(self, shape, segments):
+        """
+        Redraws the shape with a new number of segments, keeping its
+        place in the stacking order of the scene.
+        """
+        shape.delete(self.renderer)
+        shape.segments = segments
+        shape.fill(self.renderer)
+        index = self.shapes.index(shape)
+        if index < len(self.shapes) - 1:
+            self.renderer.lower(shape.tag, self.shapes[index + 1].tag)
+
+    def redraw(self, shape):
+        """
+        Deletes and draws the shape again, for example after its vertices moved.
+        """
+        self.resegment(shape, shape.segments)
+
+    def export(self, path, width=500, height=500):
+        """
+        Writes every shape of the scene, outlines included, to an SVG, PDF,
+        or PostScript file chosen by the extension of path. The chords are
+        streamed to the file as they are computed, one path per curve, so
+        shapes of any size export in constant memory. Level of detail is
+        not applied: vector files are always written at full density.
+        """
+        with open_writer(path, width, height) as writer:
+            for shape in self.shapes:
+                shape.stream(writer)
+
+    def export_png(self, path, size, drawing_size=500, tile_size=512, tiled=False, workers=1):
+        """
+        Rasterizes every shape of the scene to a size x size pixel PNG,
+        tile by tile, as raster.export_png does. Shapes with level of
+        detail on keep the chords that are visible at that size.
+        returns the paths written.
+        """
+        return export_png(self.shapes, path, size, drawing_size, tile_size, tiled, workers)
+
+    def save(self, path, chords=True):
+        """
+        Saves every shape of the scene to a binary scene file, with its
+        chord families unless chords is False. See scene_file.py.
+        """
+        save_scene(path, self.shapes, chords)
+
+    def load(self, path, replace=False, bounds=None):
+        """
+        Draws the shapes of a scene file on top of the scene, or in place of
+        it with replace=True. The file is read before anything is deleted,
+        so a file that cannot be read leaves the scene as it was.
+        Stored chord families are drawn straight from the memory-mapped
+        file; shapes with level of detail on are computed again for the
+        scale of the renderer. bounds is passed on to the webs, see Web.
+        returns the shapes loaded.
+        """
+        loaded = load_scene(path, bounds)
+        if replace:
+            self.clear()
+        for shape, families in loaded:
+            self.add(shape, None if shape.lod else families)
+        return [shape for shape, families in loaded]
+
+    def clear(self):
+        """
+        Deletes every shape of the scene and nothing else on the canvas.
+        """
+        for shape in self.shapes:
+            shape.delete(self.renderer)
+        self.shapes.clear()
+
+    def find(self, tag_or_id):
+        """
+        returns the shape with the tag or canvas item id given, or None.
+        """
+        for shape in self.shapes:
+            if tag_or_id == shape.tag or tag_or_id in shape.item_ids:
+                return shape
+        return None
+
+    def last(self):
+        """
+        returns the shape drawn last, or None if the scene is empty.
+        """
+        if self.shapes:
+            return self.shapes[-1]
+        return None
+
+    def __iter__(self):
+        return iter(self.shapes)
+
+    def __len__(self):
+        return len(self.shapes)
@@ -0,0 +1,153 @@
+import mmap
+import struct
+import sys
+from array import array
+from shapes import AXES_PROBLEMS, SHAPE_TYPES, Web, make_shape
+
+"""
+the scene_file.py file saves shapes to a compact binary scene file and
+loads them back. Each shape is stored with its type, vertices, segments,
+color, and drawing mode flags, and optionally with its chord families.
+On loading, the file is memory-mapped and the chord families are handed
+out as memoryviews into the map, so shapes can be drawn without their
+geometry being computed again.
+
+Layout (version 1, little-endian):
+    header:    magic b'PCSCENE\\0', version (H), flags (H),
+               number of shapes (I), offset of the chord data (Q)
+    per shape: type (B), flags (B), color length (H), number of vertices (I),
+               segments (I), color (utf-8), vertices (2n doubles);
+               with chords: number of families (I), then per family the
+               offset of its line1 in the chord data, in doubles (Q),
+               and the number of doubles in each line (I)
+    chord data: 8 byte aligned doubles, line1 then line2 of every family
+
+"""
+
+MAGIC = b'PCSCENE\0'
+VERSION = 1
+HAS_CHORDS = 1  # header flag: the chord families are stored
+LOD = 1  # shape flag: level of detail is on
+ENVELOPE = 2  # shape flag: only the envelopes are drawn, so no chords are stored
+
+HEADER = struct.Struct('<8sHHIQ')
+SHAPE = struct.Struct('<BBHII')
+FAMILY = struct.Struct('<QI')
+ITEM_SIZE = 8
+
+# the shape type numbers, in the order of SHAPE_TYPES
+TYPE_NAMES = list(SHAPE_TYPES)
+TYPE_NUMBERS = {name: number for number, name in enumerate(TYPE_NAMES)}
+SHAPE_NAMES = {shape_class: name for name, shape_class in SHAPE_TYPES.items()}
+
+
+def _little_endian(line):
+    """
+    returns the line as it should be written to the file.
+    """
+    if sys.byteorder == 'little':
+        return line
+    line = array('d', line)
+    line.byteswap()
+    return line
+
+
+def save_scene(path, shapes_, chords=True):
+    """
+    Writes the shapes to path. With chords=True, the full density chord
+    families of every shape are stored too, so they need not be computed
+    again on loading. Shapes in envelope mode store no chords.
+    """
+    records = []
+    families_of = []
+    offset = 0
+    for shape in shapes_:
+        color = shape.color.encode('utf-8')
+        shape_flags = (LOD if shape.lod else 0) | (ENVELOPE if shape.envelope else 0)
+        record = [SHAPE.pack(TYPE_NUMBERS[SHAPE_NAMES[type(shape)]], shape_flags, len(color),
+                             len(shape.coords) // 2, shape.segments),
+                  color, struct.pack('<%dd' % len(shape.coords), *shape.coords)]
+        if chords:
+            families = [] if shape.envelope else shape.chord_families()
+            record.append(struct.pack('<I', len(families)))
+            for line1, line2 in families:
+                record.append(FAMILY.pack(offset, len(line1)))
+                offset += len(line1) + len(line2)
+            families_of.append(families)
+        records.append(b''.join(record))
+
+    directory_end = HEADER.size + sum(len(record) for record in records)
+    data_offset = -(-directory_end // ITEM_SIZE) * ITEM_SIZE
+    with open(path, 'wb') as scene_file:
+        scene_file.write(HEADER.pack(MAGIC, VERSION, HAS_CHORDS if chords else 0, len(records), data_offset))
+        for record in records:
+            scene_file.write(record)
+        scene_file.write(b'\0' * (data_offset - directory_end))
+        for families in families_of:
+            for line1, line2 in families:
+                scene_file.write(_little_endian(line1))
+                scene_file.write(_little_endian(line2))
+
+
+def load_scene(path, bounds=None):
+    """
+    Reads the scene file at path and returns a list of (shape, families)
+    pairs, families being None when the file holds no chords. The lines of
+    the families are read-only memoryviews into the memory-mapped file,
+    which stays mapped as long as any of them is in use. bounds is passed
+    on to the webs, see Web.
+    Raises ValueError if path is not a scene file this version can read.
+    """
+    with open(path, 'rb') as scene_file:
+        try:
+            mapped = mmap.mmap(scene_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError('%s is empty' % path)
+    try:
+        magic, version, flags, num_shapes, data_offset = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            raise ValueError('%s is not a scene file' % path)
+        if version > VERSION:
+            raise ValueError('%s is a version %d scene file, this program reads version %d'
+                             % (path, version, VERSION))
+        data = None
+        if flags & HAS_CHORDS:
+            data = memoryview(mapped)[data_offset:].cast('d')
+
+        loaded = []
+        position = HEADER.size
+        for _ in range(num_shapes):
+            type_number, shape_flags, color_len, num_vertices, segments = SHAPE.unpack_from(mapped, position)
+            position += SHAPE.size
+            color = mapped[position:position + color_len].decode('utf-8')
+            position += color_len
+            coords = struct.unpack_from('<%dd' % (2 * num_vertices), mapped, position)
+            position += 2 * num_vertices * ITEM_SIZE
+            vertices = [(coords[i], coords[i + 1]) for i in range(0, len(coords), 2)]
+            shape = make_shape(TYPE_NAMES[type_number], vertices, segments, color, bounds)
+            if isinstance(shape, Web) and shape.get_point_of_int() is None:
+                raise ValueError('%s has a web that cannot be drawn: %s'
+                                 % (path, AXES_PROBLEMS[shape.axes_status]))
+            shape.lod = bool(shape_flags & LOD)
+            shape.envelope = bool(shape_flags & ENVELOPE)
+
+            families = None
+            if data is not None:
+                num_families, = struct.unpack_from('<I', mapped, position)
+                position += 4
+                families = []
+                for _ in range(num_families):
+                    offset, line_len = FAMILY.unpack_from(mapped, position)
+                    position += FAMILY.size
+                    line1 = data[offset:offset + line_len]
+                    line2 = data[offset + line_len:offset + 2 * line_len]
+                    if len(line2) != line_len:
+                        raise ValueError('%s is damaged: its chord data is cut short' % path)
+                    if sys.byteorder != 'little':
+                        line1 = _little_endian(line1)
+                        line2 = _little_endian(line2)
+                    families.append((line1, line2))
+            loaded.append((shape, families))
+    except (struct.error, IndexError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError('%s is damaged: %s' % (path, e))
+    return loaded
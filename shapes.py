@@ -1,98 +1,400 @@
+import itertools
 import math
+from array import array
+from renderers import as_renderer, chord_path
+from geometry_cache import LRUCache
 
 """
-the shapes.py file contains the Circle, Angle, Polygon, and Web classes that 
-contain the code to instantiate the objects of those classes. 
+the shapes.py file contains the Angle, Polygon, and Web classes that
+contain the code to instantiate the objects of those classes, and the
+MarkerPool class that marks the vertices clicked on the canvas.
+The drawing methods of Angle, Polygon, and Web take either a tkinter canvas
+or one of the render backends from renderers.py.
 
 """
 
-
-class Circle:
+# caches of the geometry computed so far, sized in the number of floats they hold:
+# the divided sides (reused by every shape that has the same side, in either direction)
+side_cache = LRUCache(maxsize=2 ** 22)
+# the chord families of whole shapes
+chord_cache = LRUCache(maxsize=2 ** 22)
+# the points of intersection of web axes, sized in entries
+intersection_cache = LRUCache(maxsize=4096)
+
+# the default drawing is the 500 x 500 canvas; Web checks its axes cross
+# within these (left, top, right, bottom) bounds unless it is given others
+DRAWING_SIZE = 500
+DEFAULT_BOUNDS = (0, 0, DRAWING_SIZE - 1, DRAWING_SIZE - 1)
+
+# the results of intersect_lines for each pair of lines
+INTERSECT = 'intersect'
+OUTSIDE = 'outside'  # the lines cross outside the bounds
+PARALLEL = 'parallel'
+COINCIDENT = 'coincident'  # the lines are one and the same
+DEGENERATE = 'degenerate'  # a line has no length, its two points are the same
+# why a web cannot be drawn, for each status of its axes but INTERSECT
+AXES_PROBLEMS = {OUTSIDE: 'the axes do not cross on the canvas',
+                 PARALLEL: 'the axes are parallel',
+                 COINCIDENT: 'the axes are the same line',
+                 DEGENERATE: 'an axis has no length'}
+
+
+class MarkerPool:
     """
-    A circle object is drawn to the canvas with its center at the
-    coordinates of the mouse click. It has an optional label floating
-    to the right and above the circle.
+    The vertex markers of one canvas: a small circle for each point clicked,
+    with a label floating to the right and above it. Cleared markers are
+    hidden rather than deleted and shown again for the next clicks, so once
+    the pool is warm clicking in vertices creates no canvas items. At most
+    size hidden markers are kept; any more are deleted.
     """
     # class variables
     radius = 5
     text_x_padding = 10
     text_y_padding = 15
-    all_circles = []
-    all_labels = []
 
-    def __init__(self, canvas, label_text='', color='black'):
+    def __init__(self, canvas, view=None, size=64):
         """
-        Constructor: instantiates a new Circle object at the x and y location
-        of the mouse click event and draws it to the canvas.
-        Parameters: mouse-click event, canvas,text of label, and fill color
-        Returns: None
+        view: what the drawing is seen through, such as a Viewport (anything
+        with to_canvas(coords)); None places the markers in canvas coordinates
         """
-        self.x = 0
-        self.y = 0
         self.canvas = canvas
-        self.label_text = label_text
-        self.color = color
+        self.view = view
+        self.size = size
+        self.shown = []  # [circle id, label id, x, y] of each marker shown, in order
+        self.free = []  # the same lists for the hidden markers
 
-    def draw_circle(self, event):
+    def show(self, x, y, label_text='', color='black'):
         """
-        Positions the circle with the center at the mouse click
-        coordinates passed. Draws the circle and label to the canvas.
+        Shows a marker at the point x, y of the drawing, with the label and
+        fill color given. returns the id of its circle.
         """
-        self.x = event.x
-        self.y = event.y
-        start_x = self.x - self.radius
-        start_y = self.y - self.radius
-        end_x = self.x + self.radius
-        end_y = self.y + self.radius
-        self.circle = self.canvas.create_oval(start_x, start_y, end_x, end_y, fill=self.color)
-        self.all_circles.append(self.circle)  # add the id of the circle object to the list
-        self.add_label()
+        if self.free:
+            marker = self.free.pop()
+            marker[2] = x
+            marker[3] = y
+            self.canvas.itemconfigure(marker[0], fill=color, state='normal')
+            self.canvas.itemconfigure(marker[1], text=label_text, state='normal')
+            self.place(marker)
+            # shapes drawn since it was hidden would cover it
+            self.canvas.tag_raise(marker[0])
+            self.canvas.tag_raise(marker[1])
+        else:
+            cx, cy = self.canvas_position(x, y)
+            r = self.radius
+            marker = [self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, fill=color),
+                      self.canvas.create_text(cx + self.text_x_padding, cy - self.text_y_padding,
+                                              text=label_text),
+                      x, y]
+        self.shown.append(marker)
+        return marker[0]
+
+    def canvas_position(self, x, y):
+        if self.view is None:
+            return x, y
+        cx, cy = self.view.to_canvas((x, y))
+        return cx, cy
 
-    def add_label(self):
+    def place(self, marker):
         """
-        Positions the label to the right and to the top of the circle.
-        Draws the label to the canvas.
+        Moves the circle and label of the marker to where its point is on the canvas.
         """
-        text_x = self.x + self.text_x_padding
-        text_y = self.y - self.text_y_padding
-        self.label = self.canvas.create_text(text_x, text_y, text=self.label_text)
-        self.all_labels.append(self.label)  # add the id of the text object to the list
+        cx, cy = self.canvas_position(marker[2], marker[3])
+        r = self.radius
+        self.canvas.coords(marker[0], cx - r, cy - r, cx + r, cy + r)
+        self.canvas.coords(marker[1], cx + self.text_x_padding, cy - self.text_y_padding)
 
-    def delete_circle(self):
+    def place_all(self):
         """
-        Deletes the circle and label from the canvas.
+        Moves every marker shown, for example after the view zoomed or panned,
+        and keeps them above the shapes.
         """
-        self.canvas.delete(self.circle)
-        self.canvas.delete(self.label)
-
-    # setters
-    def set_text(self, label_text):
-        self.label_text = label_text
+        for marker in self.shown:
+            self.place(marker)
+            self.canvas.tag_raise(marker[0])
+            self.canvas.tag_raise(marker[1])
 
-    def set_color(self, color):
-        self.color = color
-
-    @classmethod
-    def get_all_circles(cls):
+    def clear(self):
         """
-        returns the list of all circle object ids.
+        Hides every marker shown, keeping up to size of them for reuse.
         """
-        return cls.all_circles
+        for marker in self.shown:
+            if len(self.free) < self.size:
+                self.canvas.itemconfigure(marker[0], state='hidden')
+                self.canvas.itemconfigure(marker[1], state='hidden')
+                self.free.append(marker)
+            else:
+                self.canvas.delete(marker[0])
+                self.canvas.delete(marker[1])
+        self.shown.clear()
+
+    def __len__(self):
+        return len(self.shown)
 
-    @classmethod
-    def get_all_labels(cls):
-        """
-        returns the list of all label (text) object ids.
-        """
-        return cls.all_labels
+
+def division_points(lines, segments):
+    """
+    Divides every (start_point, end_point) line in lines into segments equal
+    parts and returns the division points of all the lines at once, as one
+    contiguous array('d') of x, y pairs (an N x 2 array stored row by row).
+    The points of line i start at index 2 * i * points_per_line(segments).
+    Each point is found directly as start + (end - start) * k / segments,
+    so no rounding error is carried from one point to the next.
+    """
+    lines = list(lines)
+    count = points_per_line(segments)
+    fractions = [k / segments for k in range(1, count + 1)]
+    coords = array('d', [0.0]) * (2 * count * len(lines))
+    for i, (start_point, end_point) in enumerate(lines):
+        x1 = start_point[0]
+        y1 = start_point[1]
+        dx = end_point[0] - x1
+        dy = end_point[1] - y1
+        first = 2 * count * i
+        last = first + 2 * count
+        # fill the x column, then the y column, of this line's rows
+        coords[first:last:2] = array('d', [x1 + dx * t for t in fractions])
+        coords[first + 1:last:2] = array('d', [y1 + dy * t for t in fractions])
+    return coords
+
+
+def points_per_line(segments):
+    """
+    returns the number of division points placed on each line for the
+    number of segments given. A line split into n segments has n - 1 inner
+    points; a single segment keeps its end point, as populate_points always has.
+    """
+    if segments < 1:
+        return 0
+    return max(segments - 1, 1)
+
+
+def as_point_list(coords):
+    """
+    converts a flat array of x, y pairs into the list of [x, y] lists
+    used by populate_points and draw_curve.
+    """
+    return [[coords[i], coords[i + 1]] for i in range(0, len(coords), 2)]
+
+
+def as_coords(points):
+    """
+    converts a list of [x, y] points into a flat array of x, y pairs.
+    """
+    coords = array('d', [0.0]) * (2 * len(points))
+    coords[0::2] = array('d', [p[0] for p in points])
+    coords[1::2] = array('d', [p[1] for p in points])
+    return coords
+
+
+def reversed_points(coords):
+    """
+    returns a copy of a flat array of x, y pairs with the order of the
+    points reversed (each x, y pair itself is kept intact).
+    """
+    flipped = array('d', coords)
+    flipped[0::2] = coords[-2::-2]
+    flipped[1::2] = coords[-1::-2]
+    return flipped
+
+
+def corner_lines(corners, segments):
+    """
+    Takes a list of corners, each a (point1, center, point2) tuple, and
+    returns a (line1, line2) pair of flat arrays for each corner: line1
+    divides point1 -> center and line2 divides center -> point2. The chords
+    line1[i] -> line2[i] make the parabolic curve in the corner.
+    The result comes from chord_cache when the same corners were divided
+    before. Otherwise the sides missing from side_cache are divided in one
+    pass; a side shared by two corners (as in a polygon) is divided only once.
+    The arrays returned are shared with the caches and must not be changed.
+    """
+    corners = tuple((tuple(point1), tuple(center), tuple(point2)) for point1, center, point2 in corners)
+    lines = chord_cache.get((corners, segments))
+    if lines is not None:
+        return lines
+
+    sides = {}
+    for point1, center, point2 in corners:
+        sides[(point1, center)] = None
+        sides[(center, point2)] = None
+    # a side divided before in the other direction only needs its points reversed
+    # (except for a single segment, whose only point is the end of the side)
+    missing = []
+    for start, end in sides:
+        keys = [(start, end, segments)]
+        if segments > 1:
+            keys.append((end, start, segments))
+        key, points = side_cache.get_any(keys)
+        if points is None:
+            missing.append((start, end))
+        elif key[0] == start:
+            sides[(start, end)] = points
+        else:
+            sides[(start, end)] = reversed_points(points)
+    if missing:
+        all_points = division_points(missing, segments)
+        side_len = 2 * points_per_line(segments)
+        for i, (start, end) in enumerate(missing):
+            points = all_points[i * side_len:(i + 1) * side_len]
+            sides[(start, end)] = points
+            side_cache.put((start, end, segments), points, len(points))
+
+    lines = tuple((sides[(point1, center)], sides[(center, point2)]) for point1, center, point2 in corners)
+    chord_cache.put((corners, segments), lines, sum(len(line1) + len(line2) for line1, line2 in lines))
+    return lines
+
+
+def lod_segments(point1, center, point2, segments, scale, spacing=1.0):
+    """
+    Level of detail: returns the number of segments worth drawing in a
+    corner at the scale given, in pixels per unit of the drawing. Chords
+    closer together than spacing pixels along the longer side of the corner
+    add nothing to the picture, so the count is capped there (but never
+    raised above segments). A scale of None means no cap.
+    """
+    if scale is None or segments < 2:
+        return segments
+    longest = max(Angle.calc_distance(point1, center), Angle.calc_distance(center, point2)) * scale
+    return min(segments, max(2, math.ceil(longest / spacing)))
+
+
+def on_segment(point, start, end):
+    """
+    returns whether a point on the line through start and end lies
+    between them.
+    """
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    length = dx * dx + dy * dy
+    if length == 0:
+        return point[0] == start[0] and point[1] == start[1]
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length
+    return -1e-9 <= t <= 1 + 1e-9
+
+
+def corner_chords(point1, center, point2, segments):
+    """
+    A generator version of corner_lines for a single corner: yields the
+    chords of the corner one at a time as (x1, y1, x2, y2) tuples, computing
+    each from the corner, so any number of segments takes constant memory.
+    """
+    x1 = point1[0]
+    y1 = point1[1]
+    dx1 = center[0] - x1
+    dy1 = center[1] - y1
+    x2 = center[0]
+    y2 = center[1]
+    dx2 = point2[0] - x2
+    dy2 = point2[1] - y2
+    for k in range(1, points_per_line(segments) + 1):
+        t = k / segments
+        yield x1 + dx1 * t, y1 + dy1 * t, x2 + dx2 * t, y2 + dy2 * t
+
+
+def intersect_lines(lines1, lines2, bounds=None):
+    """
+    Intersects many pairs of lines in one call. lines1 and lines2 are flat
+    sequences of x1, y1, x2, y2 for each line, and line i of lines1 is
+    intersected with line i of lines2, both taken as infinite lines.
+    returns (statuses, points): the INTERSECT, OUTSIDE, PARALLEL,
+    COINCIDENT, or DEGENERATE status of each pair, and a flat array of the
+    x, y of each point of intersection, nan for pairs that do not cross.
+    With bounds, (left, top, right, bottom), a point outside them is OUTSIDE.
+    """
+    left, top, right, bottom = bounds if bounds is not None else (-math.inf, -math.inf, math.inf, math.inf)
+    statuses = []
+    points = array('d', [math.nan]) * (len(lines1) // 2)
+    i = 0
+    # walk the four columns of each batch together, a pair of lines per step
+    for ax, ay, bx, by, cx, cy, dx, dy in zip(lines1[0::4], lines1[1::4], lines1[2::4], lines1[3::4],
+                                              lines2[0::4], lines2[1::4], lines2[2::4], lines2[3::4]):
+        xdiff1 = ax - bx
+        ydiff1 = ay - by
+        xdiff2 = cx - dx
+        ydiff2 = cy - dy
+        div = xdiff1 * ydiff2 - xdiff2 * ydiff1
+        if (xdiff1 == 0 and ydiff1 == 0) or (xdiff2 == 0 and ydiff2 == 0):
+            statuses.append(DEGENERATE)
+        elif div == 0:
+            # parallel; the same line if the start of the second lies on the first
+            if (cx - ax) * ydiff1 - (cy - ay) * xdiff1 == 0:
+                statuses.append(COINCIDENT)
+            else:
+                statuses.append(PARALLEL)
+        else:
+            det1 = ax * by - ay * bx
+            det2 = cx * dy - cy * dx
+            x = (det1 * xdiff2 - det2 * xdiff1) / div
+            y = (det1 * ydiff2 - det2 * ydiff1) / div
+            points[i] = x
+            points[i + 1] = y
+            statuses.append(INTERSECT if left <= x <= right and top <= y <= bottom else OUTSIDE)
+        i += 2
+    return statuses, points
+
+
+def cache_info():
+    """
+    returns the hits, misses, and sizes of the geometry caches.
+    """
+    return {'sides': side_cache.info(), 'chords': chord_cache.info(),
+            'intersections': intersection_cache.info()}
+
+
+def clear_caches():
+    side_cache.clear()
+    chord_cache.clear()
+    intersection_cache.clear()
 
 
 class Angle:
+    # the shapes keep no instance __dict__; the vertices are held in
+    # one flat array of x, y pairs instead of a list of tuples
+    __slots__ = ('coords', 'segments', 'color', 'tag', 'item_ids', 'lod', 'envelope')
+
+    # class variable, numbers the canvas tag of each shape
+    tag_counter = itertools.count(1)
+
     # constructor
     def __init__(self, vertices, segments=30, color='black'):
         self.vertices = vertices
         self.segments = segments
         self.color = color
+        # every canvas item of the shape carries this tag, so the whole
+        # shape can be deleted or recolored with a single canvas call
+        self.tag = 'shape' + str(next(self.tag_counter))
+        self.item_ids = []
+        # with level of detail on, chords too close together to see are left out
+        self.lod = False
+        # in envelope mode only the smooth curve the chords are tangent to is drawn
+        self.envelope = False
+
+    @property
+    def vertices(self):
+        """
+        the vertices of the shape, as a list of (x, y) tuples.
+        """
+        coords = self.coords
+        return [(coords[i], coords[i + 1]) for i in range(0, len(coords), 2)]
+
+    @vertices.setter
+    def vertices(self, vertices):
+        self.set_vertices(vertices)
+
+    def set_vertices(self, vertices, cached=True):
+        """
+        Moves the shape to the vertices given, a list of (x, y) points.
+        cached=False keeps whatever the new vertices take to work out
+        out of the geometry caches, as for chord_families.
+        """
+        self.coords = as_coords(vertices)
+
+    def vertex_view(self):
+        """
+        returns a read-only memoryview of the flat x, y array of the
+        vertices, for renderers that take the coordinates without copying.
+        """
+        return memoryview(self.coords).toreadonly()
 
     @staticmethod
     def calc_slope(point1, point2):
@@ -164,37 +466,43 @@ class Angle:
     def populate_points(self, start_point, end_point):
         """
         returns a list of all points lying on the line drawn by
-        start and end points given, with a slope of m, spaced at
-        div_units apart.
-        """
-        m = self.calc_slope(start_point, end_point)
-        dist = self.calc_distance(start_point, end_point)
-        div_unit = dist / self.segments
-        line_list = []
-        first_point = self.find_point2(start_point, end_point, m, div_unit)
-        line_list.append(first_point)
-        for i in range(self.segments - 2):
-            some_point = self.find_point2(line_list[i], end_point, m, div_unit)
-            line_list.append(some_point)
-        return line_list
+        start and end points given, spaced evenly so that the line
+        is divided into self.segments parts.
+        """
+        return as_point_list(division_points([(start_point, end_point)], self.segments))
 
     def draw_outline(self, canvas):
-        pt1 = self.vertices[0]
-        center = self.vertices[1]
-        pt2 = self.vertices[2]
-        canvas.create_line(pt1[0], pt1[1], center[0], center[1],
-                           fill=self.color)
-        canvas.create_line(pt2[0], pt2[1], center[0], center[1],
-                           fill=self.color)
+        self.add_item(as_renderer(canvas).draw_line(self.vertex_view()[0:6], self.color, self.tag))
 
     def draw_curve(self, line1_pts, line2_pts, canvas):
         """
         For a n number of points lying on two lines, draws lines between
         corresponding points of of the two lines.
         """
-        for x in range(len(line1_pts)):
-            canvas.create_line(line1_pts[x][0], line1_pts[x][1], line2_pts[x][0], line2_pts[x][1],
-                               fill=self.color)
+        self.draw_chords(as_coords(line1_pts), as_coords(line2_pts), canvas)
+
+    def draw_chords(self, line1, line2, canvas, outlined=(True, True), continued=False):
+        """
+        Same as draw_curve, for two flat arrays of x, y pairs.
+        All the chords are sent to the renderer as one chord family.
+        outlined says whether line1 and line2 lie on lines the outline
+        draws, see outlined_sides; a renderer that joins the chords into
+        one polyline must not step along a side that is not drawn.
+        continued=True adds the chords to the family drawn last, for a
+        curve drawn in parts.
+        """
+        if len(line1) == 0:
+            return
+        renderer = as_renderer(canvas)
+        if all(outlined) or not renderer.joins_chords:
+            draw = renderer.continue_chords if continued else renderer.draw_chords
+            self.add_item(draw(line1, line2, self.color, self.tag))
+        elif any(outlined):
+            self.add_item(renderer.draw_line(chord_path(line1, line2, outlined), self.color, self.tag))
+        else:
+            for i in range(0, len(line1), 2):
+                self.add_item(renderer.draw_line([line1[i], line1[i + 1], line2[i], line2[i + 1]],
+                                                 self.color, self.tag))
 
     def curve_btw_two_lines(self, pt1, pt2, center, canvas):
         """
@@ -202,147 +510,391 @@ class Angle:
         p1, center, p2.
         Draws a parabolic curve on the angle between those two lines.
         """
-        # places evenly spaced points all along the lines
-        l1_points = self.populate_points(pt1, center)
-        l2_points = self.populate_points(pt2, center)
-        # reverses the order of the line 2 so that the points of two lines correspond inversely
-        l2_points.reverse()
+        # places evenly spaced points along the lines, running from pt1 to the
+        # center and on from the center to pt2, so that the points correspond inversely
+        l1_points, l2_points = corner_lines([(pt1, center, pt2)], self.segments)[0]
         # draw the lines connecting the points on the lines to form a curve
-        self.draw_curve(l1_points, l2_points, canvas)
+        self.draw_chords(l1_points, l2_points, canvas)
+
+    def corners(self):
+        """
+        returns the (point1, center, point2) corners that get a curve.
+        """
+        return [(self.vertices[0], self.vertices[1], self.vertices[2])]
+
+    def outlined_sides(self):
+        """
+        returns, for each corner, whether its sides point1 -> center and
+        center -> point2 lie on lines the outline draws.
+        """
+        return [(True, True)] * len(self.corners())
+
+    def corner_segments(self, scale=None):
+        """
+        returns the number of segments used in each corner: self.segments,
+        or fewer when level of detail is on and a scale (in pixels per unit
+        of the drawing) is given.
+        """
+        corners = self.corners()
+        if not self.lod or scale is None:
+            return [self.segments] * len(corners)
+        return [lod_segments(point1, center, point2, self.segments, scale)
+                for point1, center, point2 in corners]
+
+    def chord_families(self, scale=None, cached=True):
+        """
+        returns a (line1, line2) pair of flat arrays of x, y pairs for each
+        curve of the shape; chord i runs from point i of line1 to point i of line2.
+        scale is used for level of detail, see corner_segments.
+        With cached=False the geometry caches are neither read nor filled,
+        for shapes that change all the time, such as animated ones.
+        """
+        corners = self.corners()
+        if not cached:
+            families = []
+            for (point1, center, point2), segments in zip(corners, self.corner_segments(scale)):
+                points = division_points([(point1, center), (center, point2)], segments)
+                side_len = 2 * points_per_line(segments)
+                families.append((points[:side_len], points[side_len:]))
+            return families
+        if not self.lod or scale is None:
+            return corner_lines(corners, self.segments)
+        families = []
+        for corner, segments in zip(corners, self.corner_segments(scale)):
+            families.extend(corner_lines([corner], segments))
+        return families
+
+    def chord_count(self, scale=None):
+        """
+        returns the number of chords in all the curves of the shape.
+        """
+        return sum(points_per_line(segments) for segments in self.corner_segments(scale))
+
+    def skipped_chords(self, scale):
+        """
+        returns the number of chords level of detail leaves out at the scale given.
+        """
+        return self.chord_count() - self.chord_count(scale)
+
+    def draw_families(self, canvas, families=None):
+        """
+        Draws the chord families given, or those of the shape itself.
+        In envelope mode, draws the envelopes of the curves instead.
+        """
+        renderer = as_renderer(canvas)
+        if self.envelope:
+            self.draw_envelopes(renderer)
+            return
+        if families is None:
+            families = self.chord_families(renderer.scale)
+        for (line1, line2), outlined in zip(families, self.outlined_sides()):
+            self.draw_chords(line1, line2, renderer, outlined)
+
+    def draw_envelopes(self, canvas):
+        """
+        Draws the envelope of each curve of the shape: the parabola its
+        chords are tangent to, which is the quadratic Bezier curve whose
+        control points are the point1, center, point2 of the corner.
+        One item per curve, however many segments the shape has.
+        """
+        renderer = as_renderer(canvas)
+        for point1, center, point2 in self.corners():
+            self.add_item(renderer.draw_bezier(point1, center, point2, self.color, self.tag))
+
+    def iter_families(self, scale=None):
+        """
+        yields one generator per curve of the shape; each generator yields
+        the chords of the curve lazily as (x1, y1, x2, y2) tuples.
+        Nothing is cached or kept, so memory use does not grow with segments.
+        """
+        for (point1, center, point2), segments in zip(self.corners(), self.corner_segments(scale)):
+            yield corner_chords(point1, center, point2, segments)
+
+    def iter_chords(self):
+        """
+        yields every chord of every curve of the shape lazily,
+        as (x1, y1, x2, y2) tuples.
+        """
+        for chords in self.iter_families():
+            yield from chords
+
+    def stream(self, canvas):
+        """
+        Draws the shape like fill(), but streams the chords to the renderer
+        as they are computed instead of dividing the sides first.
+        """
+        renderer = as_renderer(canvas)
+        self.draw_outline(renderer)
+        if self.envelope:
+            self.draw_envelopes(renderer)
+            return
+        for chords, outlined in zip(self.iter_families(renderer.scale), self.outlined_sides()):
+            if all(outlined) or not renderer.joins_chords:
+                self.add_item(renderer.draw_chord_stream(chords, self.color, self.tag))
+            else:
+                # the family is joined along the one side that is drawn, so it is needed whole
+                chords = list(chords)
+                self.draw_chords(array('d', [value for chord in chords for value in chord[0:2]]),
+                                 array('d', [value for chord in chords for value in chord[2:4]]),
+                                 renderer, outlined)
+
+    def delete(self, canvas):
+        """
+        Deletes every canvas item of the shape.
+        """
+        as_renderer(canvas).delete(self.tag)
+        self.item_ids.clear()
+
+    def recolor(self, canvas, color):
+        """
+        Changes the color of every canvas item of the shape.
+        """
+        self.color = color
+        as_renderer(canvas).recolor(self.tag, color)
+
+    def add_item(self, item_id):
+        """
+        keeps the id of an item the renderer created for the shape.
+        """
+        if item_id is not None:
+            self.item_ids.append(item_id)
 
     def fill_angle(self, canvas):
         """
-        Calls the curve_btw_two_lines with the vertices of the instance of the Angle object.
+        Draws the outline and the curve of the instance of the Angle object.
         """
-        pt1 = self.vertices[0]
-        center = self.vertices[1]
-        pt2 = self.vertices[2]
-        self.draw_outline(canvas)
-        self.curve_btw_two_lines(pt1, pt2, center, canvas)
+        renderer = as_renderer(canvas)
+        self.draw_outline(renderer)
+        self.draw_families(renderer)
+
+    def fill(self, canvas):
+        """
+        Draws the shape with its curves to the canvas or renderer given.
+        """
+        self.fill_angle(canvas)
 
 
 class Polygon(Angle):
+    __slots__ = ()
+
     def __init__(self, vertices, segments, color):
         super().__init__(vertices, segments, color)
 
     def draw_outline(self, canvas):
-        endpoints = self.vertices
-        line_color = self.color
-        for i in range(len(endpoints)):
-            if i == len(endpoints) - 1:  # when i reaches the last point of the endpoints,
-                index = 0  #
-            else:
-                index = i + 1
-            canvas.create_line(endpoints[i][0], endpoints[i][1], endpoints[index][0], endpoints[index][1],
-                               fill=line_color)
+        # close the outline by returning to the first point
+        outline = self.coords + self.coords[:2]
+        self.add_item(as_renderer(canvas).draw_line(outline, self.color, self.tag))
+
+    def corners(self):
+        """
+        returns a corner for every vertex of the polygon: side i runs
+        from vertex i to vertex i + 1, and the curve of corner i goes from
+        side i to the adjacent side until it reaches the starting point again.
+        """
+        # the vertices property builds a new list, so fetch it only once
+        vertices = self.vertices
+        return list(zip(vertices, vertices[1:] + vertices[:1], vertices[2:] + vertices[:2]))
 
     def fill_polygon(self, canvas):
         """
-        For a shape with an unknown number of vertices, populate the empty
-        array 'all_lines[]' with the arrays of points that lie on the sides
-        of the shape.
+        For a shape with an unknown number of vertices, divide all the
+        sides of the shape into points in one pass.
         Then draw connecting lines that form the parabolic curve from one
         side to the adjacent side until it reaches the starting point again.
-        :param canvas:
+        :param canvas: tkinter canvas or renderer
         :return:
         """
+        canvas = as_renderer(canvas)
         self.draw_outline(canvas)
-        all_lines = []
-        # fill all sides of the polygon with points
-        for i in range(len(self.vertices)):
-            x = i
-            if x == len(self.vertices) - 1:
-                y = 0
-            else:
-                y = i + 1
-            single_line = self.populate_points(self.vertices[x], self.vertices[y])
-            all_lines.append(single_line)
-
-        # draw connecting lines for all points in all lines to create the curves
-        for i in range(len(self.vertices)):
-            if i == len(self.vertices) - 1:
-                line1 = all_lines[i]
-                line2 = all_lines[0]
-            else:
-                line1 = all_lines[i]
-                line2 = all_lines[i + 1]
-            self.draw_curve(line1, line2, canvas)
+        self.draw_families(canvas)
+
+    def fill(self, canvas):
+        self.fill_polygon(canvas)
 
 
 class Web(Angle):
-    def __init__(self, vertices, segments, color):
+    """
+    A web of parabolic curves around the point where two axes cross.
+    The first four vertices are the ends of the axes: the top and bottom
+    of the y axis, then the left and right of the x axis. Any further
+    vertices are the tips of more spokes from that point, making a star.
+    Every vertex is the tip of a spoke, and a curve fills the angle between
+    each pair of neighbouring spokes, going round from the first.
+    """
+    __slots__ = ('point_of_int', 'axes_status', 'axes_bounds')
+
+    # class variable, the (left, top, right, bottom) area the axes must cross in
+    # unless a web is given its own bounds
+    bounds = DEFAULT_BOUNDS
+
+    def __init__(self, vertices, segments, color, bounds=None):
+        self.axes_bounds = self.bounds if bounds is None else bounds
+        # setting the vertices finds the point of intersection
         super().__init__(vertices, segments, color)
-        self.ytop = vertices[0]  # top of y axis
-        self.ybottom = vertices[1]  # bottom of y axis
-        self.xleft = vertices[2]  # left of x axis
-        self.xright = vertices[3]  # right of x axis
-        self.segments = segments
-        self.color = color
-        self.point_of_int = self.get_intersection(self.ytop, self.ybottom, self.xleft, self.xright)
+
+    def set_vertices(self, vertices, cached=True):
+        # the axes move with the vertices, so they are solved again
+        super().set_vertices(vertices)
+        self.solve_axes(cached)
+
+    def solve_axes(self, cached=True):
+        """
+        Finds where the axes cross, setting point_of_int and axes_status.
+        With cached=False intersection_cache is neither read nor filled.
+        """
+        key = (tuple(self.coords[0:8]), tuple(self.axes_bounds))
+        solved = intersection_cache.get(key) if cached else None
+        if solved is None:
+            statuses, points = intersect_lines(self.coords[0:4], self.coords[4:8], self.axes_bounds)
+            solved = statuses[0], (points[0], points[1]) if statuses[0] == INTERSECT else None
+            if cached:
+                intersection_cache.put(key, solved)
+        # axes_status says why point_of_int is None: the axes are parallel, cross outside the bounds, ...
+        self.axes_status, self.point_of_int = solved
+
+    @staticmethod
+    def intersections(vertex_lists, bounds=None):
+        """
+        Solves the axes of many webs in one call to intersect_lines, for
+        example to check every web of a job file before drawing any.
+        returns a (status, point) pair for each list of vertices, point
+        being None unless status is INTERSECT.
+        """
+        lines1 = array('d', [value for vertices in vertex_lists for point in vertices[0:2] for value in point])
+        lines2 = array('d', [value for vertices in vertex_lists for point in vertices[2:4] for value in point])
+        statuses, points = intersect_lines(lines1, lines2, Web.bounds if bounds is None else bounds)
+        return [(status, (points[2 * i], points[2 * i + 1]) if status == INTERSECT else None)
+                for i, status in enumerate(statuses)]
 
     def get_point_of_int(self):
         return self.point_of_int
 
+    @property
+    def ytop(self):  # top of y axis
+        return self.coords[0], self.coords[1]
+
+    @property
+    def ybottom(self):  # bottom of y axis
+        return self.coords[2], self.coords[3]
+
+    @property
+    def xleft(self):  # left of x axis
+        return self.coords[4], self.coords[5]
+
+    @property
+    def xright(self):  # right of x axis
+        return self.coords[6], self.coords[7]
+
     @staticmethod
-    def get_intersection(ytop, ybottom, xleft, xright):
-        """
-        takes in four tuples and computes the point of intersection
-        code taken and modified from Stack Overflow:
-        https://stackoverflow.com/questions/20677795/how-do-i-compute-the-intersection-point-of-two-lines
-        returns a tuple for the coord
-        """
-        line1 = (ytop, ybottom)
-        line2 = (xleft, xright)
-
-        xdiff = (ytop[0] - ybottom[0], xleft[0] - xright[0])
-        ydiff = (ytop[1] - ybottom[1], xleft[1] - xright[1])
-
-        def det(a, b):
-            return a[0] * b[1] - a[1] * b[0]
-
-        div = det(xdiff, ydiff)
-        if div == 0:
-            raise Exception('lines do not intersect')
-
-        d = (det(*line1), det(*line2))
-        x = det(d, xdiff) / div
-        y = det(d, ydiff) / div
-
-        def check_if_int_within_canvas():
-            if x < 0:
-                return False
-            if x > 499:
-                return False
-            if y < 0:
-                return False
-            if y > 499:
-                return False
-            return True
-
-        if check_if_int_within_canvas():
-            return x, y
-        else:
-            return None
+    def get_intersection(ytop, ybottom, xleft, xright, bounds=None):
+        """
+        takes in four tuples and computes the point of intersection of the
+        y axis ytop -> ybottom and the x axis xleft -> xright.
+        returns a tuple for the coord, or None if the axes are parallel or
+        cross outside of bounds, given as (left, top, right, bottom)
+        (Web.bounds by default)
+        """
+        statuses, points = intersect_lines([*ytop, *ybottom], [*xleft, *xright],
+                                           Web.bounds if bounds is None else bounds)
+        if statuses[0] == INTERSECT:
+            return points[0], points[1]
+        return None
+
+    def spokes(self):
+        """
+        returns the tips of the spokes in the order they go round the point
+        of intersection: the ends of the axes in quadrant order (top of the
+        y axis, right of the x axis, bottom of the y axis, left of the x
+        axis), with any further spokes sorted by angle into the gaps
+        between them.
+        """
+        axes = [self.ytop, self.xright, self.ybottom, self.xleft]
+        extra = self.vertices[4:]
+        if not extra:
+            return axes
+        center_x, center_y = self.point_of_int
+        full_turn = 2 * math.pi
+        angles = [math.atan2(y - center_y, x - center_x) for x, y in axes]
+        gaps = [[] for _ in axes]
+        for tip in extra:
+            angle = math.atan2(tip[1] - center_y, tip[0] - center_x)
+            for i, start in enumerate(angles):
+                offset = (angle - start) % full_turn
+                if offset < (angles[(i + 1) % len(angles)] - start) % full_turn:
+                    break
+            else:
+                # only when the tip is in line with an axis end; it goes next to the top of the y axis
+                i = 0
+                offset = (angle - angles[0]) % full_turn
+            gaps[i].append((offset, tip))
+        tips = []
+        for start, gap in zip(axes, gaps):
+            tips.append(start)
+            tips.extend(tip for offset, tip in sorted(gap))
+        return tips
 
     def draw_axes(self, canvas):
-        # draws two intersecting lines on canvas
-        canvas.create_line(self.ytop[0], self.ytop[1], self.ybottom[0], self.ybottom[1], fill=self.color)
-        canvas.create_line(self.xleft[0], self.xleft[1], self.xright[0], self.xright[1], fill=self.color)
+        # draws two intersecting lines on canvas, and any further spokes as one line
+        renderer = as_renderer(canvas)
+        view = self.vertex_view()
+        self.add_item(renderer.draw_line(view[0:4], self.color, self.tag))  # ytop to ybottom
+        self.add_item(renderer.draw_line(view[4:8], self.color, self.tag))  # xleft to xright
+        if len(self.coords) > 8:
+            center_x, center_y = self.point_of_int
+            path = []
+            for x, y in self.vertices[4:]:
+                path.extend((center_x, center_y, x, y))
+            self.add_item(renderer.draw_line(path, self.color, self.tag))
+
+    def draw_outline(self, canvas):
+        self.draw_axes(canvas)
+
+    def corners(self):
+        """
+        returns the corners between neighbouring spokes around the point of
+        intersection; for the two axes alone, the four 'quadrants'
+        (ytop, xright), (xright, ybottom), (ybottom, xleft), (xleft, ytop).
+        """
+        tips = self.spokes()
+        return [(tips[i], self.point_of_int, tips[(i + 1) % len(tips)]) for i in range(len(tips))]
+
+    def outlined_sides(self):
+        # the side from an axis end to the point of intersection is only
+        # drawn when the axes cross within that axis, not on its extension
+        on_y_axis = on_segment(self.point_of_int, self.ytop, self.ybottom)
+        on_x_axis = on_segment(self.point_of_int, self.xleft, self.xright)
+        axis_ends = {self.ytop: on_y_axis, self.ybottom: on_y_axis, self.xleft: on_x_axis, self.xright: on_x_axis}
+        # further spokes are drawn from the point of intersection
+        extra = set(self.vertices[4:])
+        drawn = [tip in extra or axis_ends[tip] for tip in self.spokes()]
+        return [(drawn[i], drawn[(i + 1) % len(drawn)]) for i in range(len(drawn))]
 
     def fill_web(self, canvas):
         """
         draws a 'web' of four parabolic curves around two intersecting lines
         denoted by the four points passed as parameters
         """
-        _ytop = self.vertices[0]
-        _ybottom = self.vertices[1]
-        _xleft = self.vertices[2]
-        _xright = self.vertices[3]
-
+        canvas = as_renderer(canvas)
         # draw the axes
         self.draw_axes(canvas)
         # draw four parabolic curves for each 'quadrant'
-        self.curve_btw_two_lines(_ytop, _xright, self.point_of_int, canvas)  # first quadrant
-        self.curve_btw_two_lines(_xright, _ybottom, self.point_of_int, canvas)  # second quadrant
-        self.curve_btw_two_lines(_ybottom, _xleft, self.point_of_int, canvas)  # third quadrant
-        self.curve_btw_two_lines(_xleft, _ytop, self.point_of_int, canvas)  # fourth quadrant
+        self.draw_families(canvas)
+
+    def fill(self, canvas):
+        self.fill_web(canvas)
+
+
+# the shape classes by the names the GUI and job files use for them
+SHAPE_TYPES = {'angle': Angle, 'poly': Polygon, 'web': Web}
+
+
+def make_shape(shape_, vertices, segments=30, color='black', bounds=None):
+    """
+    Creates an Angle, Polygon, or Web from the shape name given
+    ('angle', 'poly', or 'web'). bounds is passed on to a Web.
+    """
+    if shape_ not in SHAPE_TYPES:
+        raise ValueError('unknown shape: %r' % (shape_,))
+    if SHAPE_TYPES[shape_] is Web:
+        return Web(vertices, segments, color, bounds)
+    return SHAPE_TYPES[shape_](vertices, segments, color)
@@ -0,0 +1,55 @@
+import unittest
+from animation import Animation, ItemRenderer, updater
+from shapes import Web
+
+
+class ItemCanvas:
+    """
+    the part of a tkinter canvas an ItemRenderer uses.
+    """
+
+    def __init__(self):
+        self.items = {}  # item id -> coordinates
+        self.next_id = 1
+
+    def create_line(self, coords, **options):
+        item_id = self.next_id
+        self.next_id += 1
+        self.items[item_id] = list(coords)
+        return item_id
+
+    def coords(self, item_id, coords):
+        self.items[item_id] = list(coords)
+
+    def itemconfigure(self, item_id, **options):
+        pass
+
+    def delete(self, item_id):
+        self.items.pop(item_id, None)
+
+
+class AnimatedWebTest(unittest.TestCase):
+
+    def test_web_follows_its_axes_and_keeps_its_last_frame_when_they_stop_crossing(self):
+        canvas = ItemCanvas()
+        animation = Animation(None, ItemRenderer(canvas))
+        web = Web([(250, 10), (250, 490), (10, 250), (490, 250)], 10, 'black')
+        crossing = [(300, 10), (300, 490), (10, 200), (490, 200)]
+        parallel = [(0, 0), (100, 0), (0, 50), (100, 50)]
+        animation.add(web, updater(vertices=[lambda t, i=i: crossing[i] if t < 1 else parallel[i]
+                                             for i in range(4)]))
+
+        animation.draw_frame(0, float('inf'))
+        self.assertEqual(web.get_point_of_int(), (300.0, 200.0))
+        frame = dict(canvas.items)
+        # the first curve is drawn as for a web made at the new vertices
+        line1, line2 = Web(crossing, 10, 'black').chord_families()[0]
+        self.assertEqual(frame[3][0:4], list(line1[0:2]) + list(line2[0:2]))
+
+        animation.draw_frame(1, float('inf'))
+        self.assertIsNone(web.get_point_of_int())
+        self.assertEqual(canvas.items, frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import io
+import unittest
+from renderers import PostScriptRenderer, SVGRenderer, color_to_rgb
+
+
+class ColorTest(unittest.TestCase):
+
+    def test_x11_color_names(self):
+        self.assertEqual(color_to_rgb('navy'), (0, 0, 128))
+        self.assertEqual(color_to_rgb('pink'), (255, 192, 203))
+        self.assertEqual(color_to_rgb('DarkGreen'), (0, 100, 0))
+        self.assertEqual(color_to_rgb('dark green'), (0, 100, 0))
+        self.assertEqual(color_to_rgb('gray50'), (127, 127, 127))
+
+    def test_hex_colors(self):
+        self.assertEqual(color_to_rgb('#f80'), (255, 136, 0))
+        self.assertEqual(color_to_rgb('#FF8800'), (255, 136, 0))
+        self.assertEqual(color_to_rgb('#fff888000'), (255, 136, 0))
+        self.assertEqual(color_to_rgb('#ffff88880000'), (255, 136, 0))
+
+    def test_unknown_colors_are_not_drawn_black(self):
+        for color in ('navvy', '#12345', '#ggg', ''):
+            with self.assertRaises(ValueError):
+                color_to_rgb(color)
+
+    def test_svg_and_postscript_draw_the_same_color(self):
+        svg = io.StringIO()
+        with SVGRenderer(svg) as renderer:
+            renderer.draw_line([0, 0, 10, 10], 'green', 'shape1')
+        self.assertIn('stroke="#00ff00"', svg.getvalue())
+        postscript = io.StringIO()
+        with PostScriptRenderer(postscript) as renderer:
+            renderer.draw_line([0, 0, 10, 10], 'green', 'shape1')
+        self.assertIn('0.000 1.000 0.000 setrgbcolor', postscript.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
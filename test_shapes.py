@@ -0,0 +1,131 @@
+import math
+import unittest
+import shapes
+from renderers import SegmentListRenderer, TkRenderer
+from shapes import Polygon, Web, corner_lines
+
+
+def quadrant_chords(vertices, segments):
+    """
+    the chords of a four vertex web as the shapes drew them before webs
+    could have more spokes: the four quadrants in a fixed order.
+    """
+    ytop, ybottom, xleft, xright = [tuple(map(float, point)) for point in vertices]
+    center = Web.get_intersection(ytop, ybottom, xleft, xright)
+    corners = [(ytop, center, xright), (xright, center, ybottom),
+               (ybottom, center, xleft), (xleft, center, ytop)]
+    return [(list(line1), list(line2)) for line1, line2 in corner_lines(corners, segments)]
+
+
+class WebTest(unittest.TestCase):
+
+    def assert_same_chords(self, vertices, segments=18):
+        web = Web(vertices, segments, 'black')
+        self.assertEqual([(list(line1), list(line2)) for line1, line2 in web.chord_families()],
+                         quadrant_chords(vertices, segments))
+
+    def test_crossing_axes(self):
+        self.assert_same_chords([(250, 10), (240, 490), (10, 260), (490, 240)])
+
+    def test_t_shaped_axes(self):
+        self.assert_same_chords([(250, 10), (250, 250), (10, 250), (490, 250)])
+
+    def test_l_shaped_axes(self):
+        self.assert_same_chords([(250, 10), (250, 250), (250, 250), (490, 250)])
+
+    def test_axes_crossing_outside_a_segment(self):
+        self.assert_same_chords([(250, 10), (250, 200), (10, 250), (490, 250)])
+
+    def test_extra_spokes_fill_the_gaps_between_the_axes(self):
+        web = Web([(250, 10), (250, 490), (10, 250), (490, 250), (100, 400), (400, 100), (300, 50)],
+                  10, 'black')
+        self.assertEqual(web.spokes(), [(250, 10), (300, 50), (400, 100), (490, 250),
+                                        (250, 490), (100, 400), (10, 250)])
+        self.assertEqual(len(web.corners()), 7)
+
+    def test_moving_the_vertices_moves_the_point_of_intersection(self):
+        web = Web([(250, 10), (250, 490), (10, 250), (490, 250)], 10, 'black')
+        web.vertices = [(300, 10), (300, 490), (10, 200), (490, 200)]
+        self.assertEqual(web.get_point_of_int(), (300.0, 200.0))
+        self.assertEqual(web.corners()[0][1], (300.0, 200.0))
+        web.set_vertices([(0, 0), (100, 0), (0, 50), (100, 50)], cached=False)
+        self.assertIsNone(web.get_point_of_int())
+        self.assertEqual(web.axes_status, 'parallel')
+
+    def test_parallel_axes(self):
+        web = Web([(0, 0), (100, 0), (0, 50), (100, 50)], 10, 'black')
+        self.assertIsNone(web.get_point_of_int())
+        self.assertEqual(web.axes_status, 'parallel')
+
+
+class LineCanvas:
+    """
+    records the polylines a TkRenderer creates.
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def create_line(self, *coords, **options):
+        coords = list(coords[0]) if len(coords) == 1 else list(coords)
+        self.lines.append(coords)
+        return len(self.lines)
+
+
+def distance_to_segment(x, y, segment):
+    x1, y1, x2, y2 = segment
+    dx = x2 - x1
+    dy = y2 - y1
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length))
+    return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+
+
+class JoinedChordsTest(unittest.TestCase):
+    """
+    TkRenderer joins each chord family into one polyline; every segment of
+    it must lie on a chord or a line of the outline, as drawn one by one.
+    """
+
+    def assert_draws_nothing_new(self, vertices, segments=10):
+        baseline = SegmentListRenderer()
+        Web(vertices, segments, 'black').fill(baseline)
+        expected = [segment[:4] for segment in baseline.segments()]
+        canvas = LineCanvas()
+        Web(vertices, segments, 'black').fill(TkRenderer(canvas))
+        drawn = set()
+        for line in canvas.lines:
+            for i in range(0, len(line) - 2, 2):
+                x1, y1, x2, y2 = line[i:i + 4]
+                drawn.add((x1, y1, x2, y2))
+                self.assertTrue(any(distance_to_segment(x1, y1, segment) < 1e-9 and
+                                    distance_to_segment(x2, y2, segment) < 1e-9 for segment in expected),
+                                "segment %r is not in the baseline" % ((x1, y1, x2, y2),))
+        chords = expected[2:]
+        for x1, y1, x2, y2 in chords:
+            self.assertTrue((x1, y1, x2, y2) in drawn or (x2, y2, x1, y1) in drawn)
+
+    def test_crossing_axes(self):
+        self.assert_draws_nothing_new([(250, 10), (240, 490), (10, 260), (490, 240)])
+
+    def test_axes_crossing_outside_a_segment(self):
+        self.assert_draws_nothing_new([(250, 10), (250, 200), (10, 250), (490, 250)])
+
+    def test_axes_crossing_outside_both_segments(self):
+        self.assert_draws_nothing_new([(250, 10), (250, 200), (300, 250), (490, 250)])
+
+
+class ChordFamiliesTest(unittest.TestCase):
+
+    def test_uncached_families_match_and_leave_the_caches_alone(self):
+        polygon = Polygon([(10, 10), (250, 450), (460, 80), (300, 20)], 37, 'black')
+        shapes.clear_caches()
+        uncached = polygon.chord_families(cached=False)
+        self.assertEqual(shapes.cache_info()['chords']['entries'], 0)
+        self.assertEqual(shapes.cache_info()['sides']['entries'], 0)
+        self.assertEqual([(list(line1), list(line2)) for line1, line2 in uncached],
+                         [(list(line1), list(line2)) for line1, line2 in polygon.chord_families()])
+
+
+if __name__ == '__main__':
+    unittest.main()
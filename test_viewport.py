@@ -0,0 +1,97 @@
+import unittest
+from scene import Scene
+from shapes import Polygon
+from viewport import Viewport
+
+
+class StackingCanvas:
+    """
+    the part of a tkinter canvas the viewport uses, keeping the items in
+    stacking order, lowest first. Like Tk, tag_lower fails when below_tag
+    has no items.
+    """
+
+    def __init__(self):
+        self.items = []  # [item id, tags], lowest first
+        self.next_id = 1
+
+    def create_line(self, coords, **options):
+        item_id = self.next_id
+        self.next_id += 1
+        self.items.append([item_id, options.get('tags', ())])
+        return item_id
+
+    def find_withtag(self, tag):
+        return tuple(item_id for item_id, tags in self.items if tag in tags)
+
+    def delete(self, tag):
+        self.items = [item for item in self.items if tag not in item[1]]
+
+    def itemconfigure(self, tag, **options):
+        pass
+
+    def tag_lower(self, tag, below_tag):
+        below = [index for index, item in enumerate(self.items) if below_tag in item[1]]
+        if not below:
+            raise ValueError('tagOrId "%s" doesn\'t match any items' % below_tag)
+        moved = [item for item in self.items if tag in item[1]]
+        others = [item for item in self.items if tag not in item[1]]
+        index = min(index for index, item in enumerate(others) if below_tag in item[1])
+        self.items = others[:index] + moved + others[index:]
+
+    def tag_order(self):
+        order = []
+        for item_id, tags in self.items:
+            if tags[0] not in order:
+                order.append(tags[0])
+        return order
+
+
+class ViewportLowerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.canvas = StackingCanvas()
+        self.viewport = Viewport(self.canvas, 500, 500, 5000, 5000)
+        self.scene = Scene(self.viewport)
+
+    def test_resegment_with_the_next_shape_out_of_view(self):
+        shape_a = self.scene.add(Polygon([(10, 10), (300, 10), (300, 300)], 10, 'black'))
+        shape_b = self.scene.add(Polygon([(3000, 3000), (3300, 3000), (3300, 3300)], 10, 'red'))
+        self.assertEqual(self.canvas.find_withtag(shape_b.tag), ())
+        self.scene.resegment(shape_a, 20)
+        self.assertEqual(self.viewport.ranks[shape_a.tag], 0)
+        self.assertEqual(self.viewport.ranks[shape_b.tag], 1)
+
+    def test_resegment_goes_below_the_next_shape_in_view(self):
+        shape_a = self.scene.add(Polygon([(10, 10), (300, 10), (300, 300)], 10, 'black'))
+        shape_b = self.scene.add(Polygon([(3000, 3000), (3300, 3000), (3300, 3300)], 10, 'red'))
+        shape_c = self.scene.add(Polygon([(20, 20), (200, 20), (200, 200)], 10, 'blue'))
+        self.scene.resegment(shape_a, 20)
+        self.assertEqual(self.canvas.tag_order(), [shape_a.tag, shape_c.tag])
+        self.assertEqual([self.viewport.ranks[shape.tag] for shape in (shape_a, shape_b, shape_c)], [0, 1, 2])
+
+
+class ContinuedChordsTest(unittest.TestCase):
+
+    def test_a_family_drawn_in_parts_is_redrawn_as_one_item(self):
+        canvas = StackingCanvas()
+        viewport = Viewport(canvas, 500, 500, 5000, 5000, block_size=4)
+        line1 = [float(x) for i in range(20) for x in (10 * i, 0)]
+        line2 = [float(x) for i in range(20) for x in (0, 10 * i)]
+        viewport.draw_chords(line1[:14], line2[:14], 'black', 'shape1')
+        viewport.continue_chords(line1[14:], line2[14:], 'black', 'shape1')
+        self.assertEqual(len({block[5] for block in viewport.blocks.values()}), 1)
+        viewport.redraw()
+        self.assertEqual(len(canvas.find_withtag('shape1')), 1)
+
+    def test_chords_after_other_drawing_start_a_new_family(self):
+        canvas = StackingCanvas()
+        viewport = Viewport(canvas, 500, 500, 5000, 5000)
+        viewport.draw_chords([0, 0, 10, 0], [0, 10, 0, 20], 'black', 'shape1')
+        viewport.draw_line([0, 0, 100, 100], 'black', 'shape1')
+        viewport.continue_chords([20, 0], [0, 30], 'black', 'shape1')
+        self.assertEqual(len({block[5] for block in viewport.blocks.values()}), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,388 @@
+import itertools
+import math
+from array import array
+from renderers import Renderer, as_float_array, bezier_points, bezier_steps, chord_path
+
+"""
+the viewport.py file contains the Viewport class, a render backend that
+puts a zoomable, pannable view of a large drawing on a tkinter canvas.
+Everything drawn is kept in drawing coordinates, in blocks of a few
+chords, and filed in a SpatialIndex grid by bounding box. The canvas only
+gets items for the blocks in view, and the same index finds the shape
+under the mouse without looking at every canvas item.
+
+"""
+
+VIEW_TAG = 'viewport'  # carried by every canvas item the viewport creates
+
+
+class SpatialIndex:
+    """
+    A uniform grid over the plane. Each item is filed in every cell its
+    bounding box touches, so finding the items near a point or in a
+    rectangle only looks at the cells that cover it.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of items
+        self.item_cells = {}  # item -> the cells it is filed in
+
+    def cell_range(self, bbox):
+        left, top, right, bottom = bbox
+        size = self.cell_size
+        return (range(math.floor(left / size), math.floor(right / size) + 1),
+                range(math.floor(top / size), math.floor(bottom / size) + 1))
+
+    def insert(self, item, bbox):
+        columns, rows = self.cell_range(bbox)
+        cells = [(column, row) for column in columns for row in rows]
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(item)
+        self.item_cells[item] = cells
+
+    def remove(self, item):
+        for cell in self.item_cells.pop(item, ()):
+            items = self.cells[cell]
+            items.discard(item)
+            if not items:
+                del self.cells[cell]
+
+    def query(self, bbox):
+        """
+        returns the set of items filed in the cells the bbox touches;
+        their own bounding boxes may still miss it.
+        """
+        columns, rows = self.cell_range(bbox)
+        found = set()
+        if len(columns) * len(rows) > len(self.cells):
+            # a rectangle bigger than the occupied part of the grid: walk the occupied cells instead
+            for (column, row), items in self.cells.items():
+                if column in columns and row in rows:
+                    found.update(items)
+            return found
+        for column in columns:
+            for row in rows:
+                items = self.cells.get((column, row))
+                if items:
+                    found.update(items)
+        return found
+
+    def __len__(self):
+        return len(self.item_cells)
+
+
+def overlaps(bbox1, bbox2):
+    return bbox1[0] <= bbox2[2] and bbox2[0] <= bbox1[2] and bbox1[1] <= bbox2[3] and bbox2[1] <= bbox1[3]
+
+
+def coords_bbox(*lines):
+    xs = [value for line in lines for value in line[0::2]]
+    ys = [value for line in lines for value in line[1::2]]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def segment_distance(px, py, x1, y1, x2, y2):
+    """
+    returns the distance from the point (px, py) to the segment (x1, y1) - (x2, y2).
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length))
+    return math.hypot(px - x1 - t * dx, py - y1 - t * dy)
+
+
+class Viewport(Renderer):
+    """
+    Draws to a tkinter canvas of width x height pixels showing the part of
+    the drawing from (x0, y0) at zoom pixels per unit. The drawing
+    itself is world_width x world_height units.
+
+    Shapes draw to it like to any renderer, so a Scene can use it as is.
+    Each chord family is split into blocks of block_size chords (and each
+    polyline into blocks of block_size segments) that are filed in the
+    spatial index. After every change of view, redraw() creates canvas
+    items only for the blocks in view, merging the neighbouring blocks of
+    a family into one item.
+    """
+    joins_chords = True
+
+    def __init__(self, canvas, width, height, world_width=None, world_height=None,
+                 block_size=64, cell_size=64, max_zoom=64.0):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.world_width = width if world_width is None else world_width
+        self.world_height = height if world_height is None else world_height
+        self.block_size = block_size
+        self.max_zoom = max_zoom
+        self.zoom = 1.0
+        self.x0 = 0.0
+        self.y0 = 0.0
+        self.index = SpatialIndex(cell_size)
+        self.blocks = {}  # block id -> (tag, kind, coords, line2, bbox, family)
+        self.tag_blocks = {}  # tag -> ids of its blocks, in drawing order
+        self.colors = {}  # tag -> color
+        self.ranks = {}  # tag -> stacking order of the tag, lowest first
+        self.next_rank = 0
+        self.block_ids = itertools.count()
+        self.last_block = None  # the id of the block added last
+        self.family_ids = itertools.count()
+
+    @property
+    def scale(self):
+        # level of detail and curve flattening follow the zoom
+        return self.zoom
+
+    # coordinates
+
+    def view_bbox(self):
+        """
+        returns the part of the drawing in view, as (left, top, right, bottom).
+        """
+        return self.x0, self.y0, self.x0 + self.width / self.zoom, self.y0 + self.height / self.zoom
+
+    def to_world(self, x, y):
+        """
+        converts a canvas position to drawing coordinates.
+        """
+        return self.x0 + x / self.zoom, self.y0 + y / self.zoom
+
+    def to_canvas(self, coords):
+        """
+        converts a flat sequence of x, y pairs in drawing coordinates
+        to canvas coordinates.
+        """
+        coords = as_float_array(coords)
+        if self.zoom == 1.0 and self.x0 == 0.0 and self.y0 == 0.0:
+            return coords
+        zoom = self.zoom
+        x0 = self.x0
+        y0 = self.y0
+        converted = array('d', coords)
+        converted[0::2] = array('d', [(x - x0) * zoom for x in coords[0::2]])
+        converted[1::2] = array('d', [(y - y0) * zoom for y in coords[1::2]])
+        return converted
+
+    # changing the view; the caller redraws afterwards
+
+    def clamp(self):
+        min_zoom = max(self.width / self.world_width, self.height / self.world_height)
+        self.zoom = min(max(self.zoom, min_zoom), self.max_zoom)
+        self.x0 = min(max(self.x0, 0.0), max(0.0, self.world_width - self.width / self.zoom))
+        self.y0 = min(max(self.y0, 0.0), max(0.0, self.world_height - self.height / self.zoom))
+
+    def zoom_at(self, x, y, factor):
+        """
+        Zooms in by factor (out if below 1), keeping the drawing under the
+        canvas position (x, y) in place.
+        """
+        world_x, world_y = self.to_world(x, y)
+        self.zoom *= factor
+        self.clamp()
+        self.x0 = world_x - x / self.zoom
+        self.y0 = world_y - y / self.zoom
+        self.clamp()
+
+    def pan(self, dx, dy):
+        """
+        Moves the drawing by dx, dy canvas pixels.
+        """
+        self.x0 -= dx / self.zoom
+        self.y0 -= dy / self.zoom
+        self.clamp()
+
+    def reset(self):
+        self.zoom = 1.0
+        self.x0 = 0.0
+        self.y0 = 0.0
+        self.clamp()
+
+    # recording what is drawn
+
+    def add_block(self, tag, kind, coords, line2, family):
+        block_id = next(self.block_ids)
+        bbox = coords_bbox(coords) if line2 is None else coords_bbox(coords, line2)
+        self.blocks[block_id] = (tag, kind, coords, line2, bbox, family)
+        self.index.insert(block_id, bbox)
+        self.tag_blocks[tag].append(block_id)
+        self.last_block = block_id
+        return block_id
+
+    def start_tag(self, tag, color):
+        if tag not in self.tag_blocks:
+            self.tag_blocks[tag] = []
+            self.ranks[tag] = self.next_rank
+            self.next_rank += 1
+        self.colors[tag] = color
+
+    def draw_line(self, coords, color, tag):
+        self.start_tag(tag, color)
+        coords = as_float_array(coords)
+        family = next(self.family_ids)
+        step = 2 * self.block_size
+        # neighbouring blocks share their end point, so the polyline stays joined
+        ids = [self.add_block(tag, 'line', coords[start:start + step + 2], None, family)
+               for start in range(0, max(len(coords) - 2, 1), step)]
+        return self.emit(ids)
+
+    def draw_chords(self, line1, line2, color, tag):
+        if len(line1) == 0:
+            return None
+        return self.add_chords(line1, line2, color, tag, next(self.family_ids))
+
+    def continue_chords(self, line1, line2, color, tag):
+        # the new blocks join the family when nothing else was drawn since,
+        # so their ids follow on and redraw() merges them into its items
+        last = self.blocks.get(self.last_block)
+        if last is None or last[0] != tag or last[1] != 'chords':
+            return self.draw_chords(line1, line2, color, tag)
+        if len(line1) == 0:
+            return None
+        return self.add_chords(line1, line2, color, tag, last[5])
+
+    def add_chords(self, line1, line2, color, tag, family):
+        self.start_tag(tag, color)
+        line1 = as_float_array(line1)
+        line2 = as_float_array(line2)
+        step = 2 * self.block_size
+        ids = [self.add_block(tag, 'chords', line1[start:start + step], line2[start:start + step], family)
+               for start in range(0, len(line1), step)]
+        return self.emit(ids)
+
+    def draw_bezier(self, point0, point1, point2, color, tag, tolerance=0.25):
+        self.start_tag(tag, color)
+        coords = array('d', [point0[0], point0[1], point1[0], point1[1], point2[0], point2[1]])
+        # the curve lies inside the triangle of its control points, so their bbox holds it
+        return self.emit([self.add_block(tag, 'bezier', coords, None, next(self.family_ids))])
+
+    # canvas items
+
+    def emit(self, ids):
+        """
+        Creates the canvas items of the blocks given that are in view.
+        The blocks must be in drawing order; runs of neighbouring blocks
+        of the same family become one item. returns the id of the last
+        item created.
+        """
+        view = self.view_bbox()
+        item = None
+        run = []
+        previous = None
+        for block_id in ids:
+            block = self.blocks[block_id]
+            if not overlaps(block[4], view):
+                continue
+            if run and (block_id != previous + 1 or block[5] != run[-1][5]):
+                item = self.emit_run(run)
+                run = []
+            run.append(block)
+            previous = block_id
+        if run:
+            item = self.emit_run(run)
+        return item
+
+    def emit_run(self, run):
+        tag, kind = run[0][0], run[0][1]
+        tags = (tag, VIEW_TAG)
+        color = self.colors[tag]
+        if kind == 'chords':
+            line1 = array('d')
+            line2 = array('d')
+            for block in run:
+                line1.extend(block[2])
+                line2.extend(block[3])
+            return self.canvas.create_line(chord_path(self.to_canvas(line1), self.to_canvas(line2)).tolist(),
+                                           fill=color, tags=tags)
+        if kind == 'line':
+            coords = array('d', run[0][2])
+            for block in run[1:]:
+                coords.extend(block[2][2:])  # leave out the shared point
+            return self.canvas.create_line(self.to_canvas(coords).tolist(), fill=color, tags=tags)
+        coords = run[0][2]
+        steps = bezier_steps(coords[0:2], coords[2:4], coords[4:6], 0.25 / self.zoom)
+        return self.canvas.create_line(self.to_canvas(coords).tolist(), smooth=True, splinesteps=steps,
+                                       fill=color, tags=tags)
+
+    def redraw(self):
+        """
+        Replaces the canvas items with those of the blocks now in view.
+        """
+        self.canvas.delete(VIEW_TAG)
+        visible = self.index.query(self.view_bbox())
+        ranks = self.ranks
+        blocks = self.blocks
+        self.emit(sorted(visible, key=lambda block_id: (ranks[blocks[block_id][0]], block_id)))
+
+    def visible_blocks(self):
+        """
+        returns the number of blocks in view, out of the number drawn.
+        """
+        view = self.view_bbox()
+        return sum(1 for block_id in self.index.query(view) if overlaps(self.blocks[block_id][4], view)), \
+            len(self.blocks)
+
+    # changing what is drawn
+
+    def delete(self, tag):
+        for block_id in self.tag_blocks.pop(tag, ()):
+            self.index.remove(block_id)
+            del self.blocks[block_id]
+        self.colors.pop(tag, None)
+        self.ranks.pop(tag, None)
+        self.canvas.delete(tag)
+
+    def recolor(self, tag, color):
+        if tag in self.colors:
+            self.colors[tag] = color
+        self.canvas.itemconfigure(tag, fill=color)
+
+    def lower(self, tag, below_tag):
+        if tag not in self.ranks or below_tag not in self.ranks:
+            return
+        order = sorted((rank, name) for name, rank in self.ranks.items() if name != tag)
+        names = [name for rank, name in order]
+        names.insert(names.index(below_tag), tag)
+        self.ranks = {name: rank for rank, name in enumerate(names)}
+        self.next_rank = len(names)
+        # tag_lower fails on a tag without items, and the tags out of view
+        # have none: go below the lowest tag above this one that is in view
+        for name in names[names.index(tag) + 1:]:
+            if self.canvas.find_withtag(name):
+                self.canvas.tag_lower(tag, name)
+                return
+
+    # hit-testing
+
+    def tag_at(self, x, y, radius=3):
+        """
+        returns the tag of the topmost thing drawn within radius pixels of
+        the canvas position (x, y), or None. Only the blocks filed in the
+        grid cells around the point are looked at, topmost first, and the
+        first one close enough answers.
+        """
+        world_x, world_y = self.to_world(x, y)
+        reach = radius / self.zoom
+        area = (world_x - reach, world_y - reach, world_x + reach, world_y + reach)
+        candidates = [block_id for block_id in self.index.query(area) if overlaps(self.blocks[block_id][4], area)]
+        ranks = self.ranks
+        blocks = self.blocks
+        candidates.sort(key=lambda block_id: (ranks[blocks[block_id][0]], block_id), reverse=True)
+        for block_id in candidates:
+            tag, kind, coords, line2, bbox, family = blocks[block_id]
+            if self.block_distance(kind, coords, line2, world_x, world_y) <= reach:
+                return tag
+        return None
+
+    def block_distance(self, kind, coords, line2, x, y):
+        if kind == 'chords':
+            return min(segment_distance(x, y, coords[i], coords[i + 1], line2[i], line2[i + 1])
+                       for i in range(0, len(coords), 2))
+        if kind == 'bezier':
+            coords = bezier_points(coords[0:2], coords[2:4], coords[4:6],
+                                   bezier_steps(coords[0:2], coords[2:4], coords[4:6], 0.25 / self.zoom))
+        if len(coords) == 2:
+            return math.hypot(x - coords[0], y - coords[1])
+        return min(segment_distance(x, y, coords[i], coords[i + 1], coords[i + 2], coords[i + 3])
+                   for i in range(0, len(coords) - 2, 2))
@@ -0,0 +1,52 @@
+"""
+the views.py file contains the ViewManager class, which shows one of a
+set of frames at a time in the same grid cell, building each frame the
+first time it is shown and keeping it for later.
+
+"""
+
+
+class ViewManager:
+    """
+    Keeps the frames of the views by key and tracks the one shown.
+    Switching views ungrids the frame shown and grids the new one, so a
+    switch costs the same however many views there are, and showing the
+    view already shown does nothing.
+    """
+
+    def __init__(self, build):
+        """
+        build(key): returns a new frame for the view key, not yet gridded
+        """
+        self.build = build
+        self.frames = {}
+        self.current = None  # key of the view shown
+
+    def frame(self, key):
+        """
+        returns the frame of the view key, building it if needed.
+        """
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = self.frames[key] = self.build(key)
+        return frame
+
+    def get(self, key):
+        """
+        returns the frame of the view key, or None if it was never built.
+        """
+        return self.frames.get(key)
+
+    def show(self, key):
+        """
+        Shows the view key in place of the one shown.
+        returns True if the view changed.
+        """
+        if key == self.current:
+            return False
+        frame = self.frame(key)
+        if self.current is not None:
+            self.frames[self.current].grid_forget()
+        frame.grid()
+        self.current = key
+        return True